@@ -0,0 +1,317 @@
+import argparse
+import hashlib
+import hmac
+import json
+import logging
+import math
+import os
+import threading
+import uuid
+from datetime import date
+
+from flask import Flask, g, jsonify, request, send_file
+from werkzeug.utils import secure_filename
+
+from filter_engine import get_filter_index
+from ingest_worker import get_worker
+from lead_export import EXPORT_FORMATS, claim_export
+from login_guard import auth_config_version, load_auth_config
+from metrics import stage_timer
+from results_cache import filter_key, get_results_cache
+from rollup import SUMMARY_SOURCE, get_cube, query_summary
+from tenants import ALL_TENANTS, all_tenants, all_tenants_store, tenant_store
+
+# =========================
+# Headless KPI API
+# =========================
+# The dashboard's KPIs and chart aggregates as compact JSON for other internal
+# tools, computed from the same tenant stores, rollup cube and results cache
+# (so a filter state the dashboard already rendered is a cache hit here too):
+#
+#     python api.py --port 8502
+#     curl -H "Authorization: Bearer $API_KEY" \
+#         "http://127.0.0.1:8502/api/v1/kpis?start=2025-01-01&end=2025-01-31&min_score=3&vehicle=Car"
+#
+# Query parameters mirror the dashboard filters: start/end (ISO dates, default
+# the whole data range), min_score/max_score (default 0-5), vehicle
+# (repeatable, default all) and tenant (a tenant label, or "All tenants";
+# default the first tenant the key may read).
+#
+# Every response carries an ETag derived from the tenant, the data version and
+# the filters. Polling clients that send it back in If-None-Match get a 304
+# without any query running; a new snapshot changes the version and so the tag.
+# Serialized bodies are cached per ETag as well.
+#
+# Every request needs an API key as a bearer token (or X-API-Key header), and
+# each key only reads the tenants listed for it in config.yaml:
+#
+#     api_keys:
+#       reporting:                       # a name for the key
+#         key: "a long random string"
+#         tenants: ["SMEP"]              # labels; "All tenants" for the combined view
+#
+# With no keys configured the API refuses to start (and answers 401).
+#
+# The dashboard links large lead exports to /api/v1/exports/<token> (see
+# lead_export.py). The random token is the credential there; the file is
+# streamed from disk and removed, so each link works once.
+
+API_HOST = os.getenv("LABX_API_HOST", "127.0.0.1")
+API_PORT = int(os.getenv("LABX_API_PORT", "8502"))
+
+logger = logging.getLogger(__name__)
+# Snapshot versions restart at 1 with the process, so tags also name the process
+_INSTANCE = uuid.uuid4().hex
+# Tenants and API keys resolved from config.yaml, keyed by auth_config_version()
+_resolved_cache = {}
+_resolved_lock = threading.Lock()
+
+
+class BadRequest(ValueError):
+    pass
+
+
+class Forbidden(ValueError):
+    pass
+
+
+def api_keys(config):
+    """{key: tenant names it may read} from the config's optional `api_keys` section."""
+    section = config.get("api_keys") or {}
+    if not isinstance(section, dict):
+        raise ValueError("config.yaml 'api_keys' must map key names to a key and its tenants.")
+    keys = {}
+    for name, entry in section.items():
+        entry = entry if isinstance(entry, dict) else {}
+        key, tenants = entry.get("key"), entry.get("tenants")
+        if isinstance(tenants, str):
+            tenants = [tenants]
+        if not isinstance(key, str) or not key or not tenants:
+            raise ValueError(f"config.yaml API key '{name}' needs a 'key' and a list of 'tenants'.")
+        if key in keys:
+            raise ValueError(f"config.yaml API key '{name}' repeats another entry's key.")
+        keys[key] = tuple(str(tenant) for tenant in tenants)
+    return keys
+
+
+def _resolved_config():
+    """(tenants, {name: Tenant}, api keys) from the auth config, resolved once per version of it."""
+    version = auth_config_version()
+    with _resolved_lock:
+        resolved = _resolved_cache.get(version)
+        if resolved is None:
+            config = load_auth_config()
+            tenants = all_tenants(config)
+            resolved = (tenants, {tenant.name: tenant for tenant in tenants}, api_keys(config))
+            _resolved_cache.clear()
+            _resolved_cache[version] = resolved
+    return resolved
+
+
+def load_api_keys():
+    return _resolved_config()[2]
+
+
+def _tenant_store(name, allowed):
+    if name not in allowed:
+        raise Forbidden(f"This API key cannot read tenant '{name}'. Allowed: {', '.join(allowed)}.")
+    tenants, by_name, _ = _resolved_config()
+    if name == ALL_TENANTS:
+        return all_tenants_store(tenants)
+    if name not in by_name:
+        raise BadRequest(f"Unknown tenant '{name}'.")
+    return tenant_store(by_name[name])
+
+
+def _snapshot(store):
+    # Same rule as the dashboard: with an ingest worker running, never fetch inline
+    if get_worker(store) is not None and store.snapshot is not None:
+        return store.snapshot
+    return store.get()
+
+
+def _parse_date(args, name, default):
+    value = args.get(name)
+    if not value:
+        return default
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise BadRequest(f"'{name}' must be an ISO date (YYYY-MM-DD), got '{value}'.")
+
+
+def _parse_score(args, name, default):
+    value = args.get(name)
+    if value is None or value == "":
+        return default
+    try:
+        score = float(value)
+    except ValueError:
+        raise BadRequest(f"'{name}' must be a number, got '{value}'.")
+    if not 0.0 <= score <= 5.0:
+        raise BadRequest(f"'{name}' must be between 0 and 5, got {value}.")
+    return score
+
+
+def parse_filters(args, cube):
+    """Sidebar-equivalent filters from query parameters; defaults select everything."""
+    today = date.today()
+    start_date = _parse_date(args, "start", cube.first_day or today)
+    end_date = _parse_date(args, "end", cube.last_day or today)
+    min_score = _parse_score(args, "min_score", 0.0)
+    max_score = _parse_score(args, "max_score", 5.0)
+    if start_date > end_date or min_score > max_score:
+        raise BadRequest("Empty filter range: 'start' is after 'end' or 'min_score' is above 'max_score'.")
+    vehicle_types = args.getlist("vehicle") or list(cube.vehicle_types)
+    return start_date, end_date, min_score, max_score, vehicle_types
+
+
+def _number(value, digits=2):
+    # JSON has no NaN (e.g. the average score when nothing is scored)
+    return None if value is None or math.isnan(value) else round(float(value), digits)
+
+
+def kpis_payload(kpis):
+    total_leads, completion_rate, avg_score, high_quality_rate = kpis
+    return {
+        "total_leads": int(total_leads),
+        "completion_rate": _number(completion_rate),
+        "avg_score": _number(avg_score),
+        "high_quality_rate": _number(high_quality_rate),
+    }
+
+
+def aggregates_payload(frames):
+    """Chart frames as column arrays: hourly counts by hour 0-23, daily counts from `daily_start`."""
+    daily = frames['daily']
+    return {
+        "hourly": frames['hourly']['Count'].astype(int).tolist(),
+        "daily_start": daily['Timestamp'].iloc[0].date().isoformat() if len(daily) else None,
+        "daily": daily['Leads'].astype(int).tolist(),
+        "scores": {"score": frames['scores']['Score'].astype(float).tolist(),
+                   "count": frames['scores']['Count'].astype(int).tolist()},
+        "vehicles": {"vehicle_type": frames['vehicles']['Vehicle Type'].astype(str).tolist(),
+                     "count": frames['vehicles']['Count'].astype(int).tolist()},
+    }
+
+
+ENDPOINTS = {
+    "kpis": lambda kpis, frames: {"kpis": kpis_payload(kpis)},
+    "aggregates": lambda kpis, frames: {"kpis": kpis_payload(kpis), **aggregates_payload(frames)},
+}
+
+
+def _allowed_tenants(keys):
+    """Tenant names the request's API key may read, or None without a valid key."""
+    header = request.headers.get("Authorization", "")
+    token = (header[7:] if header.startswith("Bearer ") else request.headers.get("X-API-Key", "")).encode()
+    allowed = None
+    # Compare against every key, so timing does not tell how many there are or which matched
+    for key, tenants in keys.items():
+        if hmac.compare_digest(token, key.encode()):
+            allowed = tenants
+    return allowed
+
+
+def create_app(store_for=_tenant_store, keys_for=load_api_keys):
+    """The API app; `store_for(tenant, allowed)` picks the LeadStore and `keys_for()`
+    returns {key: tenant names} (both overridable for benchmarks)."""
+    app = Flask(__name__)
+
+    @app.errorhandler(BadRequest)
+    def bad_request(e):
+        return jsonify(error=str(e)), 400
+
+    @app.errorhandler(Forbidden)
+    def forbidden(e):
+        return jsonify(error=str(e)), 403
+
+    @app.before_request
+    def check_key():
+        if request.endpoint == "export":
+            return None
+        g.allowed_tenants = _allowed_tenants(keys_for())
+        if g.allowed_tenants is None:
+            return jsonify(error="Missing or invalid API key."), 401
+
+    @app.get("/api/v1/exports/<token>")
+    def export(token):
+        claimed = claim_export(token)
+        if claimed is None:
+            return jsonify(error="Unknown or expired export link. Prepare the export again."), 404
+        f, export_format = claimed
+        extension, mime = EXPORT_FORMATS[export_format]
+        name = secure_filename(request.args.get("name", "")) or f"labx_leads.{extension}"
+        # Streamed a block at a time; the response closes the file
+        response = send_file(f, mimetype=mime, as_attachment=True, download_name=name, conditional=False)
+        response.content_length = os.fstat(f.fileno()).st_size
+        response.headers["Cache-Control"] = "no-store"
+        return response
+
+    @app.get("/api/v1/<endpoint>")
+    def aggregates(endpoint):
+        if endpoint not in ENDPOINTS:
+            return jsonify(error=f"Unknown endpoint '{endpoint}'. Use one of: {', '.join(ENDPOINTS)}."), 404
+        tenant = request.args.get("tenant") or g.allowed_tenants[0]
+        try:
+            store = store_for(tenant, g.allowed_tenants)
+            snapshot = _snapshot(store)
+        except (BadRequest, Forbidden):
+            raise
+        except Exception as e:
+            logger.warning("Leads unavailable for API request: %s", e)
+            return jsonify(error=f"Leads are not available yet: {e}"), 503
+
+        cube = get_cube(store, snapshot)
+        filters = parse_filters(request.args, cube)
+        key = filter_key(cube.version, *filters)
+        etag = hashlib.blake2b(repr((_INSTANCE, tenant, endpoint) + key).encode(), digest_size=12).hexdigest()
+        if request.if_none_match.contains(etag):
+            response = app.response_class(status=304)
+        else:
+            results_cache = get_results_cache(store)
+
+            def render():
+                with stage_timer("api_render"):
+                    index = get_filter_index(store, snapshot) if SUMMARY_SOURCE == "scan" else None
+                    kpis, frames = results_cache.get_or_compute(key, lambda: query_summary(cube, *filters, index=index))
+                    start_date, end_date, min_score, max_score, vehicle_types = filters
+                    body = {
+                        "version": cube.version,
+                        "filters": {"start": start_date.isoformat(), "end": end_date.isoformat(),
+                                    "min_score": min_score, "max_score": max_score,
+                                    "vehicle": sorted(map(str, vehicle_types))},
+                        **ENDPOINTS[endpoint](kpis, frames),
+                    }
+                    return json.dumps(body, separators=(",", ":")).encode()
+            body = results_cache.get_or_compute(key + ("api", endpoint), render)
+            response = app.response_class(body, mimetype="application/json")
+        response.set_etag(etag)
+        # Clients may keep the body but must revalidate it (cheaply, via the ETag)
+        response.headers["Cache-Control"] = "no-cache"
+        return response
+
+    return app
+
+
+app = create_app()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve dashboard KPIs and aggregates as JSON.")
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    # A line per request would cost more than serving a 304
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    if not load_api_keys():
+        parser.exit(1, "No API keys configured; add an 'api_keys' section to config.yaml (see api.py).\n")
+    from werkzeug.serving import WSGIRequestHandler, run_simple
+    # Keep-alive lets polling clients reuse their connection
+    WSGIRequestHandler.protocol_version = "HTTP/1.1"
+    run_simple(args.host, args.port, app, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import argparse
+import http.client
+import logging
+import threading
+import time
+
+from werkzeug.serving import make_server
+
+from api import create_app
+from benchmarks.synthetic import synthetic_leads
+from leads_data import LeadStore
+
+# =========================
+# KPI API Throughput Benchmark
+# =========================
+# Requests/second the JSON API sustains over real HTTP on localhost, with
+# keep-alive clients polling one filter state: full 200 responses (served
+# from the cached body) and 304 revalidations. Data is synthetic and held in
+# memory; no Sheets, no config.yaml. Run from the repo root:
+#
+#     python -m benchmarks.api_bench --clients 4 --requests 500
+#
+# Client threads share the interpreter with the server, so these numbers are
+# a lower bound for a dedicated API process.
+
+PATH = "/api/v1/aggregates?min_score=3"
+API_KEY = "bench"
+
+
+def poll(port, requests, etag, statuses):
+    connection = http.client.HTTPConnection("127.0.0.1", port)
+    headers = {"Authorization": f"Bearer {API_KEY}", **({"If-None-Match": etag} if etag else {})}
+    for _ in range(requests):
+        connection.request("GET", PATH, headers=headers)
+        response = connection.getresponse()
+        response.read()
+        statuses.append(response.status)
+    connection.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark KPI API throughput over HTTP.")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=500, help="requests per client")
+    args = parser.parse_args(argv)
+
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    store = LeadStore(lambda: synthetic_leads(args.rows))
+    store.get()
+    app = create_app(store_for=lambda tenant, allowed: store, keys_for=lambda: {API_KEY: ("bench",)})
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    server.RequestHandlerClass.protocol_version = "HTTP/1.1"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_port
+
+    connection = http.client.HTTPConnection("127.0.0.1", port)
+    connection.request("GET", PATH, headers={"Authorization": f"Bearer {API_KEY}"})
+    response = connection.getresponse()
+    response.read()
+    etag = response.getheader("ETag")
+
+    print(f"{'response':>10} {'req/s':>10}")
+    for label, tag in [("200", None), ("304", etag)]:
+        statuses = []
+        threads = [threading.Thread(target=poll, args=(port, args.requests, tag, statuses)) for _ in range(args.clients)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        assert set(statuses) == {int(label)}, set(statuses)
+        print(f"{label:>10} {len(statuses) / elapsed:>10.0f}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import argparse
+import time
+
+import plotly.io as pio
+
+from benchmarks.synthetic import synthetic_leads
+from charts import BUILDERS, FIGURE_CACHE_ENTRIES, build_figure, cached_figure
+from leads_data import LeadSnapshot
+from results_cache import ResultsCache
+from rollup import RollupCube, chart_frames
+
+# =========================
+# Chart Build vs Serialization Benchmark
+# =========================
+# Per chart: Plotly Express build, JSON serialization (which st.plotly_chart
+# repeats on every send), and the cached path (hash the aggregated frame +
+# cache lookup). Run from the repo root:
+#
+#     python -m benchmarks.chart_bench
+
+
+def timed(function):
+    started = time.perf_counter()
+    function()
+    return time.perf_counter() - started
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark dashboard figure construction.")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    frame = synthetic_leads(args.rows)
+    cube = RollupCube().update(LeadSnapshot(frame=frame, version=1, loaded_at=0))
+    result = cube.query(cube.first_day, cube.last_day, 0.0, 5.0, cube.vehicle_types)
+    frames = chart_frames(result)
+
+    figure_cache = ResultsCache(max_entries=FIGURE_CACHE_ENTRIES, versioned=False)
+    print(f"{'chart':>10} {'build':>10} {'serialize':>10} {'cached':>10}")
+    for chart in BUILDERS:
+        builds = [build_figure(chart, frames[chart]) for _ in range(args.repeat)]
+        cached_figure(figure_cache, chart, frames[chart])
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            cached_figure(figure_cache, chart, frames[chart])
+        cached = (time.perf_counter() - started) / args.repeat
+        build = min(b.build_seconds for b in builds)
+        serialize = min(timed(lambda: pio.to_json(b.figure, validate=False)) for b in builds)
+        print(f"{chart:>10} {build * 1e3:>8.2f}ms {serialize * 1e3:>8.2f}ms {cached * 1e3:>8.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
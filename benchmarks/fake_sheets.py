@@ -0,0 +1,128 @@
+import re
+import time
+
+import pandas as pd
+from gspread.utils import a1_to_rowcol, numericise_all, to_records
+
+from benchmarks.synthetic import SHEET_HEADER, sheet_values
+
+# =========================
+# Offline Worksheet
+# =========================
+# Stand-in for the parts of gspread.Worksheet the loaders call (get,
+# batch_get, get_all_records), backed by a synthetic_leads(text_columns=True)
+# frame. Cell strings are produced per request, so a 10M-row "sheet" costs
+# only what a fetch of it would return. No network, no credentials; `latency`
+# adds a fixed delay per request to stand in for the API round trip. FakeClient
+# serves it in place of the authorized gspread client, including the Drive
+# modifiedTime the change probe reads (counted in `drive_requests`).
+
+_ROWS_RANGE = re.compile(r"^(\d+):(\d+)$")
+_CELLS_RANGE = re.compile(r"^([A-Z]+)(\d+)(?::([A-Z]+)(\d*))?$")
+
+
+class FakeWorksheet:
+    """Append-only worksheet: a header row plus one row per synthetic lead."""
+
+    def __init__(self, frame, title="Sheet1", latency=0.0):
+        self.frame = frame
+        self.id = 0
+        self.title = title
+        self.latency = latency
+        self.requests = 0
+        self.drive_requests = 0
+        self.modified_time = self._now()
+
+    @staticmethod
+    def _now():
+        return pd.Timestamp.now(tz="UTC").strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+    def _request(self):
+        self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    @property
+    def row_count(self):
+        return len(self.frame) + 1
+
+    @property
+    def col_count(self):
+        return len(SHEET_HEADER)
+
+    def append(self, frame):
+        """Add leads below the existing rows, as new form submissions would."""
+        self.frame = pd.concat([self.frame, frame], ignore_index=True)
+        self.modified_time = self._now()
+
+    def _values(self, first_row, last_row=None, first_col=1, last_col=None):
+        # 1-based, inclusive sheet coordinates; row 1 is the header
+        last_col = last_col or len(SHEET_HEADER)
+        values = [list(SHEET_HEADER)] if first_row == 1 else []
+        start = max(first_row - 2, 0)
+        stop = None if last_row is None else max(last_row - 1, 0)
+        values += sheet_values(self.frame, start, stop)
+        if first_col != 1 or last_col != len(SHEET_HEADER):
+            values = [row[first_col - 1:last_col] for row in values]
+        return values
+
+    def _range(self, range_name):
+        match = _ROWS_RANGE.match(range_name)
+        if match:
+            return self._values(int(match.group(1)), int(match.group(2)))
+        match = _CELLS_RANGE.match(range_name)
+        if not match:
+            raise ValueError(f"Unsupported range '{range_name}'.")
+        first_col = a1_to_rowcol(f"{match.group(1)}1")[1]
+        last_col = a1_to_rowcol(f"{match.group(3)}1")[1] if match.group(3) else first_col
+        last_row = int(match.group(4)) if match.group(4) else None
+        if not match.group(3):
+            last_row = int(match.group(2))
+        return self._values(int(match.group(2)), last_row, first_col, last_col)
+
+    def get(self, range_name=None, pad_values=False, **kwargs):
+        self._request()
+        return self._range(range_name) if range_name else self._values(1)
+
+    def get_all_values(self, **kwargs):
+        return self.get()
+
+    def batch_get(self, ranges, **kwargs):
+        self._request()
+        return [self._range(range_name) for range_name in ranges]
+
+    def get_all_records(self, **kwargs):
+        values = self.get()
+        return to_records(values[0], [numericise_all(row) for row in values[1:]])
+
+
+class FakeSpreadsheet:
+    """One-worksheet spreadsheet around a FakeWorksheet."""
+
+    def __init__(self, worksheet, id="offline"):
+        self.id = id
+        self.title = "Microfinance Leads"
+        self.sheet1 = worksheet
+
+    def get_worksheet_by_id(self, worksheet_id):
+        return self.sheet1
+
+
+class FakeClient:
+    """Stand-in for the authorized gspread client: every spreadsheet is `worksheet`'s."""
+
+    def __init__(self, worksheet):
+        self.spreadsheet = FakeSpreadsheet(worksheet)
+
+    def open(self, title):
+        return self.spreadsheet
+
+    def open_by_key(self, key):
+        return self.spreadsheet
+
+    def get_file_drive_metadata(self, id):
+        worksheet = self.spreadsheet.sheet1
+        worksheet.drive_requests += 1
+        if worksheet.latency:
+            time.sleep(worksheet.latency)
+        return {"id": id, "name": self.spreadsheet.title, "modifiedTime": worksheet.modified_time}
@@ -0,0 +1,61 @@
+import argparse
+import time
+from datetime import timedelta
+
+from benchmarks.synthetic import synthetic_leads
+from filter_engine import LeadIndex
+
+# =========================
+# Filter Latency Benchmark
+# =========================
+# Compares the dashboard's original mask (two `.dt.date` passes, object
+# `isin`, full `.copy()`) with LeadIndex.select + take. Run from the repo root:
+#
+#     python -m benchmarks.filter_bench --rows 10000 1000000 10000000
+
+
+def pandas_filter(df, start_date, end_date, min_score, max_score, vehicle_types):
+    mask = (
+        (df['Timestamp'].dt.date >= start_date) &
+        (df['Timestamp'].dt.date <= end_date) &
+        (df['Score'].between(min_score, max_score)) &
+        (df['Vehicle Type'].isin(vehicle_types))
+    )
+    return df[mask].copy()
+
+
+def best_of(repeat, func, *args):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func(*args)
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard filter path.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 1_000_000, 10_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    print(f"{'rows':>12} {'pandas mask':>12} {'index build':>12} {'select':>10} {'select+take':>12} {'speedup':>8}")
+    for rows in args.rows:
+        df = synthetic_leads(rows)
+        last_day = df['Timestamp'].max().date()
+        # A typical interaction: last 30 days, score >= 3, three vehicle types
+        filters = (last_day - timedelta(days=29), last_day, 3.0, 5.0, ["Motorbike", "Car", "Tuk Tuk"])
+
+        before, expected = best_of(args.repeat, pandas_filter, df, *filters)
+        build, index = best_of(1, LeadIndex, df)
+        select, positions = best_of(args.repeat, index.select, *filters)
+        take, filtered = best_of(args.repeat, lambda: df.take(positions))
+        assert len(filtered) == len(expected)
+
+        after = select + take
+        print(f"{rows:>12,} {before * 1e3:>10.2f}ms {build * 1e3:>10.2f}ms {select * 1e3:>8.3f}ms "
+              f"{after * 1e3:>10.3f}ms {before / after:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import argparse
+import statistics
+import threading
+import time
+
+import bcrypt
+
+from benchmarks.synthetic import synthetic_leads
+from leads_data import LeadSnapshot
+from login_guard import LoginGuard
+from rollup import RollupCube, chart_frames
+
+# =========================
+# Login Storm Benchmark
+# =========================
+# Login throughput and dashboard rerun latency while many clients submit the
+# login form at once: idle, bcrypt checked inline in every script thread (as
+# stauth.Authenticate does), and through LoginGuard's bounded pool. Run from
+# the repo root:
+#
+#     python -m benchmarks.login_bench --clients 32 --seconds 10
+
+
+def storm(clients, seconds, attempt):
+    """Run `attempt()` from `clients` threads for `seconds`; return outcome counts."""
+    counts = {}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def client():
+        while time.perf_counter() < deadline:
+            outcome = attempt()
+            with lock:
+                counts[outcome] = counts.get(outcome, 0) + 1
+            if outcome == "busy":
+                time.sleep(0.5)  # a refused user retries after a moment
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    return threads, counts
+
+
+def rerun_latencies(cube, seconds):
+    """Time the dashboard's per-rerun work (cube query + chart frames) repeatedly."""
+    timings = []
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        chart_frames(cube.query(cube.first_day, cube.last_day, 0.0, 5.0, cube.vehicle_types))
+        timings.append(time.perf_counter() - started)
+        time.sleep(0.05)  # think time between interactions
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark login throughput and rerun latency under a login storm.")
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=None, help="LoginGuard pool size (default: LABX_LOGIN_WORKERS)")
+    args = parser.parse_args(argv)
+
+    hashed = bcrypt.hashpw(b"test123", bcrypt.gensalt()).decode()
+    credentials = {"usernames": {"sumac": {"password": hashed}}}
+    cube = RollupCube().update(LeadSnapshot(frame=synthetic_leads(args.rows), version=1, loaded_at=0))
+
+    guard_options = {"username_limit": "1000000/second", "ip_limit": "1000000/second"}
+    if args.workers:
+        guard_options["workers"] = args.workers
+    guard = LoginGuard(**guard_options)
+
+    def inline():
+        return "ok" if bcrypt.checkpw(b"test123", hashed.encode()) else "invalid"
+
+    def guarded():
+        return guard.verify(credentials, "sumac", "test123", "10.0.0.1").status
+
+    print(f"{'scenario':>10} {'logins/s':>10} {'refused':>8} {'rerun p50':>10} {'rerun p95':>10}")
+    for scenario, attempt in [("idle", None), ("inline", inline), ("guarded", guarded)]:
+        threads, counts = storm(args.clients, args.seconds, attempt) if attempt else ([], {})
+        timings = sorted(rerun_latencies(cube, args.seconds))
+        for thread in threads:
+            thread.join()
+        p95 = timings[int(len(timings) * 0.95)]
+        print(f"{scenario:>10} {counts.get('ok', 0) / args.seconds:>10.1f} {counts.get('busy', 0):>8} "
+              f"{statistics.median(timings) * 1e3:>8.1f}ms {p95 * 1e3:>8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
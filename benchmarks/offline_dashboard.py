@@ -0,0 +1,33 @@
+import os
+import runpy
+import sys
+
+# Streamlit puts this file's directory on sys.path; the app modules live one up
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import sheets_client
+from benchmarks.fake_sheets import FakeClient, FakeWorksheet
+from benchmarks.synthetic import synthetic_leads
+
+# =========================
+# Offline Dashboard
+# =========================
+# Streamlit entry point serving dashboard.py with its Sheets client swapped
+# for an in-memory FakeClient of LABX_BENCH_ROWS synthetic leads, so the real
+# app can be driven without credentials (see rerun_replay.py). Auth still
+# comes from config.yaml in the working directory.
+#
+#     streamlit run benchmarks/offline_dashboard.py
+
+ROWS = int(os.getenv("LABX_BENCH_ROWS", "100000"))
+# Another copy of the dashboard (e.g. an older revision) to serve instead
+DASHBOARD = os.getenv("LABX_BENCH_DASHBOARD", os.path.join(ROOT, "dashboard.py"))
+
+# This file runs on every rerun; install the offline client once per process
+with sheets_client._gc_lock:
+    if not isinstance(sheets_client._gc, FakeClient):
+        sheets_client._gc = FakeClient(FakeWorksheet(synthetic_leads(ROWS, text_columns=True)))
+
+runpy.run_path(DASHBOARD, run_name="__main__")
@@ -0,0 +1,145 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pyarrow
+
+from benchmarks.fake_sheets import FakeWorksheet
+from benchmarks.filter_bench import best_of
+from benchmarks.synthetic import synthetic_leads
+from charts import BUILDERS, build_figure
+from filter_engine import LeadIndex
+from lead_export import iter_csv
+from leads_data import LEAD_SCHEMA, LeadSnapshot, add_time_columns, normalize_leads
+from rollup import RollupCube, chart_frames
+from sheets_sync import IncrementalSheetLoader
+from snapshot_store import read_snapshot, write_snapshot
+
+# =========================
+# Pipeline Benchmark Suite
+# =========================
+# Times each stage of load -> filter -> KPI -> chart separately on
+# deterministic synthetic leads served by an offline FakeWorksheet, and emits
+# one JSON document so CI can diff runs. Run from the repo root:
+#
+#     python -m benchmarks.pipeline_bench --output bench.json
+#     python -m benchmarks.pipeline_bench --rows 10000 100000 --repeat 5
+#
+# Sheet stages (building every cell as a Python string, as gspread does) are
+# skipped above --sheet-max-rows and reported as null.
+
+STAGES = [
+    "fetch_records", "normalize_records", "load_values", "sync_append",
+    "snapshot_write", "snapshot_read", "index_build", "filter_select",
+    "cube_build", "kpi_query", "chart_frames", "chart_build", "export_csv",
+]
+
+
+def sheet_stages(frame, repeat, append_rows):
+    """Stage timings for pulling `frame` through the FakeWorksheet; returns (timings, leads)."""
+    timings = {}
+    worksheet = FakeWorksheet(frame.iloc[:len(frame) - append_rows].reset_index(drop=True))
+    timings["fetch_records"], records = best_of(repeat, worksheet.get_all_records)
+    timings["normalize_records"], _ = best_of(repeat, normalize_leads, records)
+    del records
+
+    def initial_load():
+        loader = IncrementalSheetLoader(lambda: worksheet)
+        loader()
+        return loader
+    timings["load_values"], loader = best_of(repeat, initial_load)
+
+    worksheet.append(frame.iloc[len(frame) - append_rows:])
+    started = time.perf_counter()
+    leads = loader()
+    timings["sync_append"] = time.perf_counter() - started
+    assert loader.full_reloads == 1 and len(leads) == len(frame)
+    return timings, leads
+
+
+def frame_stages(leads, repeat):
+    timings = {}
+    with tempfile.TemporaryDirectory(prefix="labx-bench-") as tmp:
+        path = os.path.join(tmp, "leads.parquet")
+        timings["snapshot_write"], _ = best_of(repeat, write_snapshot, leads, path)
+        timings["snapshot_read"], _ = best_of(repeat, read_snapshot, path)
+
+    last_day = leads['Timestamp'].max().date()
+    vehicles = list(leads['Vehicle Type'].cat.categories)
+    # A typical interaction: last 30 days, score >= 3, all vehicle types
+    filters = (last_day - timedelta(days=29), last_day, 3.0, 5.0, vehicles)
+    timings["index_build"], index = best_of(repeat, LeadIndex, leads)
+    timings["filter_select"], positions = best_of(repeat, index.select, *filters)
+
+    snapshot = LeadSnapshot(frame=leads, version=1, loaded_at=0)
+    timings["cube_build"], cube = best_of(repeat, lambda: RollupCube().update(snapshot))
+    timings["kpi_query"], result = best_of(repeat, cube.query, *filters)
+    timings["chart_frames"], frames = best_of(repeat, chart_frames, result)
+    timings["chart_build"], _ = best_of(repeat, lambda: [build_figure(chart, frames[chart]) for chart in BUILDERS])
+    timings["export_csv"], _ = best_of(repeat, lambda: sum(len(chunk) for chunk in iter_csv(leads, positions)))
+    return timings
+
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "pyarrow": pyarrow.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time each dashboard pipeline stage on synthetic leads.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000, 10_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sheet-max-rows", type=int, default=1_000_000)
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    runs = []
+    for rows in args.rows:
+        with_sheet = rows <= args.sheet_max_rows
+        frame = synthetic_leads(rows, seed=args.seed, text_columns=with_sheet)
+        timings = dict.fromkeys(STAGES)
+        if with_sheet:
+            sheet_timings, leads = sheet_stages(frame, args.repeat, append_rows=max(1, rows // 1000))
+            timings.update(sheet_timings)
+        else:
+            leads = add_time_columns(frame[list(LEAD_SCHEMA)].astype(LEAD_SCHEMA))
+        del frame
+        timings.update(frame_stages(leads, args.repeat))
+        runs.append({"rows": rows, "stages": timings})
+
+        summary = " · ".join(f"{stage} {seconds * 1e3:.1f}ms" for stage, seconds in timings.items() if seconds is not None)
+        print(f"{rows:>12,}: {summary}", file=sys.stderr)
+
+    report = {
+        "benchmark": "pipeline",
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "environment": environment(),
+        "units": "seconds (best of repeat)",
+        "runs": runs,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
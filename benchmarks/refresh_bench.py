@@ -0,0 +1,72 @@
+import argparse
+import time
+from functools import partial
+
+import sheets_client
+from benchmarks.fake_sheets import FakeClient, FakeWorksheet
+from benchmarks.synthetic import synthetic_leads
+from sheet_changes import SIGNALS, ConditionalLoader
+from sheets_client import SheetsClient, load_leads
+from sheets_sync import IncrementalSheetLoader
+
+# =========================
+# Conditional Refresh Benchmark
+# =========================
+# Polls an offline FakeWorksheet the way the ingest worker does, for each sync
+# mode (full / incremental) and change signal (off / drive / tail), and counts
+# Sheets and Drive requests and the time spent. A quiet stretch has no new
+# leads; a busy one appends a few every --append-every polls. Run from the
+# repo root:
+#
+#     python -m benchmarks.refresh_bench --rows 20000 --polls 60
+
+
+def poll(frame, sync_mode, signal, polls, append_every, append_rows, latency):
+    """Timings and request counts for `polls` refreshes after an initial load."""
+    initial = len(frame) - (polls // append_every * append_rows if append_every else 0)
+    worksheet = FakeWorksheet(frame.iloc[:initial].reset_index(drop=True), latency=latency)
+    sheets_client._gc = FakeClient(worksheet)
+    client = SheetsClient()
+    if sync_mode == "full":
+        loader = partial(load_leads, client.worksheet)
+    else:
+        loader = IncrementalSheetLoader(client.worksheet)
+    if signal != "off":
+        loader = ConditionalLoader(loader, partial(SIGNALS[signal], client))
+    loader()
+    worksheet.requests = worksheet.drive_requests = 0
+
+    started = time.perf_counter()
+    for number in range(1, polls + 1):
+        if append_every and number % append_every == 0:
+            worksheet.append(frame.iloc[len(worksheet.frame):len(worksheet.frame) + append_rows])
+        leads = loader()
+    seconds = time.perf_counter() - started
+    assert len(leads) == len(worksheet.frame), "a refresh missed appended leads"
+    return seconds, worksheet.requests, worksheet.drive_requests, getattr(loader, "skips", 0)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark refreshes with and without a change signal.")
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--polls", type=int, default=60)
+    parser.add_argument("--append-every", type=int, default=10, help="polls between appends in the busy stretch")
+    parser.add_argument("--append-rows", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added per API request")
+    args = parser.parse_args(argv)
+
+    frame = synthetic_leads(args.rows, text_columns=True)
+    print(f"{args.rows:,} leads · {args.polls} polls · {args.latency * 1e3:.0f} ms per request")
+    print(f"{'stretch':>8} {'sync':>12} {'signal':>7} {'total':>10} {'per poll':>10} "
+          f"{'sheets':>7} {'drive':>6} {'skipped':>8}")
+    for stretch, append_every in [("quiet", 0), ("busy", args.append_every)]:
+        for sync_mode in ["full", "incremental"]:
+            for signal in ["off", *SIGNALS]:
+                seconds, requests, drive_requests, skips = poll(
+                    frame, sync_mode, signal, args.polls, append_every, args.append_rows, args.latency)
+                print(f"{stretch:>8} {sync_mode:>12} {signal:>7} {seconds * 1e3:>8.0f}ms "
+                      f"{seconds / args.polls * 1e3:>8.2f}ms {requests:>7} {drive_requests:>6} {skips:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import argparse
+import time
+from datetime import timedelta
+
+from benchmarks.filter_bench import best_of
+from benchmarks.synthetic import synthetic_leads
+from leads_data import LeadSnapshot
+from pdf_report import ReportQueue, build_report
+from results_cache import filter_key
+from rollup import RollupCube, chart_frames
+
+# =========================
+# PDF Report Benchmark
+# =========================
+# Report build time (cube query + chart frames + matplotlib + FPDF) as the
+# selected date range grows, and the cost of serving the same filter state
+# again from the ReportQueue cache. Run from the repo root:
+#
+#     python -m benchmarks.report_bench --days 7 30 90 365 730
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark PDF report generation.")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, nargs="+", default=[7, 30, 90, 365, 730])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    cube = RollupCube().update(LeadSnapshot(frame=synthetic_leads(args.rows), version=1, loaded_at=0))
+    queue = ReportQueue()
+
+    print(f"{'days':>6} {'leads':>10} {'query':>10} {'build':>10} {'size':>8} {'cached':>10}")
+    for days in args.days:
+        filters = (cube.last_day - timedelta(days=days - 1), cube.last_day, 0.0, 5.0, cube.vehicle_types)
+        query, result = best_of(args.repeat, lambda: cube.query(*filters))
+        kpis = (result.total_leads, result.completion_rate, result.avg_score, result.high_quality_rate)
+        frames = chart_frames(result)
+        build, report = best_of(args.repeat, build_report, kpis, frames, filters)
+
+        key = filter_key(cube.version, *filters)
+        queue.request(key, lambda: report).result()
+        started = time.perf_counter()
+        assert queue.get(key) is report
+        cached = time.perf_counter() - started
+        print(f"{days:>6} {result.total_leads:>10,} {query * 1e3:>8.1f}ms {build * 1e3:>8.0f}ms "
+              f"{len(report) / 1024:>6.0f}KB {cached * 1e6:>8.1f}us")
+
+
+if __name__ == "__main__":
+    main()
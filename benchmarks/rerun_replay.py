@@ -0,0 +1,199 @@
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import bcrypt
+import yaml
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+from tornado.websocket import websocket_connect
+
+# =========================
+# Interaction Replay Benchmark
+# =========================
+# Server time per dashboard interaction, measured the way a browser sees it:
+# the real app runs under `streamlit run` (benchmarks/offline_dashboard.py,
+# synthetic leads, a throwaway config.yaml), and a scripted client on its
+# websocket logs in, then replays filter and chart-control changes. Each
+# interaction is timed from sending the widget state to the end of the
+# resulting script run; a change inside a fragment is sent as a fragment
+# rerun, like the browser does. Run from the repo root:
+#
+#     python -m benchmarks.rerun_replay --rounds 10
+#
+# Compare with another revision of the dashboard via --dashboard, e.g.
+#
+#     git show HEAD~1:dashboard.py > /tmp/dashboard_before.py
+#     python -m benchmarks.rerun_replay --dashboard /tmp/dashboard_before.py
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "benchmarks", "offline_dashboard.py")
+USERNAME, PASSWORD = "bench", "bench-password"
+FINISHED = (ForwardMsg.FINISHED_SUCCESSFULLY, ForwardMsg.FINISHED_FRAGMENT_RUN_SUCCESSFULLY)
+
+
+def write_config(directory):
+    config = {
+        "credentials": {"usernames": {USERNAME: {
+            "name": "Bench", "email": "bench@example.com",
+            "password": bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(rounds=4)).decode(),
+        }}},
+        "cookie": {"name": "labx_bench", "key": os.urandom(16).hex(), "expiry_days": 1},
+        "preauthorized": [],
+    }
+    with open(os.path.join(directory, "config.yaml"), "w") as f:
+        yaml.safe_dump(config, f)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class ReplayClient:
+    """Minimal Streamlit frontend: tracks widgets by label and sends reruns."""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.widgets = {}       # label -> (element type, proto, fragment id)
+        self.states = {}        # widget id -> WidgetState sent with every rerun
+        self.page_hash = ""
+
+    async def rerun(self, fragment_id=""):
+        """Send one rerun; return (seconds until the script run finished, was a fragment run)."""
+        message = BackMsg()
+        message.rerun_script.page_script_hash = self.page_hash
+        message.rerun_script.fragment_id = fragment_id
+        message.rerun_script.widget_states.widgets.extend(self.states.values())
+        # Button presses are one-shot
+        self.states = {key: state for key, state in self.states.items() if not state.HasField("trigger_value")}
+        started = time.perf_counter()
+        await self.connection.write_message(message.SerializeToString(), binary=True)
+        while True:
+            raw = await self.connection.read_message()
+            if raw is None:
+                raise RuntimeError("The Streamlit server closed the connection.")
+            forward = ForwardMsg.FromString(raw)
+            kind = forward.WhichOneof("type")
+            if kind == "new_session":
+                self.page_hash = forward.new_session.page_script_hash
+            elif kind == "delta" and forward.delta.WhichOneof("type") == "new_element":
+                element = forward.delta.new_element
+                proto = getattr(element, element.WhichOneof("type"))
+                if getattr(proto, "id", "") and getattr(proto, "label", ""):
+                    self.widgets[proto.label] = (element.WhichOneof("type"), proto, forward.delta.fragment_id)
+            elif kind == "script_finished" and forward.script_finished in FINISHED:
+                return time.perf_counter() - started, forward.script_finished == ForwardMsg.FINISHED_FRAGMENT_RUN_SUCCESSFULLY
+
+    def set(self, label, **value):
+        """Stage a widget value (a WidgetState field, e.g. double_array_value=[...]); returns its fragment id."""
+        if label not in self.widgets:
+            raise KeyError(f"No widget labelled '{label}' on the page (have: {', '.join(sorted(self.widgets))}).")
+        _, proto, fragment_id = self.widgets[label]
+        state = WidgetState(id=proto.id)
+        for field, data in value.items():
+            if field.endswith("_array_value"):
+                getattr(state, field).data.extend(data)
+            else:
+                setattr(state, field, data)
+        self.states[proto.id] = state
+        return fragment_id
+
+    async def interact(self, label, **value):
+        return await self.rerun(self.set(label, **value))
+
+
+def interactions(client):
+    """The replayed sequence: (name, label, WidgetState value) per interaction."""
+    date_range = client.widgets["Date Range"][1]
+    last_day = datetime.strptime(date_range.default[-1], "%Y/%m/%d").date()
+    vehicles = list(client.widgets["Vehicle Types"][1].options)
+    return [
+        ("score 3-5", "Score Range", {"double_array_value": [3.0, 5.0]}),
+        ("two vehicles", "Vehicle Types", {"string_array_value": vehicles[:2]}),
+        ("last 30 days", "Date Range", {"string_array_value": [(last_day - timedelta(days=29)).strftime("%Y/%m/%d"),
+                                                               last_day.strftime("%Y/%m/%d")]}),
+        ("per hour", "Resolution", {"int_value": 1}),
+        ("per day", "Resolution", {"int_value": 0}),
+        ("all dates", "Date Range", {"string_array_value": list(date_range.default)}),
+        ("all vehicles", "Vehicle Types", {"string_array_value": vehicles}),
+        ("score 0-5", "Score Range", {"double_array_value": [0.0, 5.0]}),
+    ]
+
+
+async def replay(port, rounds):
+    url = f"ws://127.0.0.1:{port}/_stcore/stream"
+    deadline = time.perf_counter() + 60
+    while True:
+        try:
+            connection = await websocket_connect(url, subprotocols=["streamlit"], max_message_size=1 << 30)
+            break
+        except OSError:
+            if time.perf_counter() > deadline:
+                raise
+            await asyncio.sleep(0.2)
+    client = ReplayClient(connection)
+    await client.rerun()
+    client.set("Username", string_value=USERNAME)
+    client.set("Password", string_value=PASSWORD)
+    login_seconds, _ = await client.interact("Login", trigger_value=True)
+    if "Date Range" not in client.widgets:
+        raise RuntimeError("Login failed; the dashboard did not render.")
+    client.states.clear()
+    warm_seconds, _ = await client.rerun()
+
+    timings = {}
+    for _ in range(rounds):
+        for name, label, value in interactions(client):
+            seconds, fragment = await client.interact(label, **value)
+            timings.setdefault(name, ([], fragment))[0].append(seconds)
+    connection.close()
+    return login_seconds, warm_seconds, timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay dashboard interactions against a live Streamlit server.")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--dashboard", default=os.path.join(ROOT, "dashboard.py"), help="dashboard script to serve")
+    args = parser.parse_args(argv)
+
+    port = free_port()
+    with tempfile.TemporaryDirectory() as workdir:
+        write_config(workdir)
+        env = dict(os.environ, LABX_BENCH_ROWS=str(args.rows), LABX_BENCH_DASHBOARD=os.path.abspath(args.dashboard),
+                   LABX_METRICS_PORT="0", PYTHONPATH=ROOT)
+        server = subprocess.Popen(
+            [sys.executable, "-m", "streamlit", "run", APP, "--server.headless", "true",
+             "--server.port", str(port), "--server.address", "127.0.0.1", "--server.fileWatcherType", "none",
+             "--browser.gatherUsageStats", "false", "--logger.level", "error"],
+            cwd=workdir, env=env, stdout=subprocess.DEVNULL)
+        try:
+            login_seconds, warm_seconds, timings = asyncio.run(replay(port, args.rounds))
+        finally:
+            server.terminate()
+            server.wait()
+
+    print(f"{args.dashboard} · {args.rows:,} leads · {args.rounds} rounds")
+    print(f"login + first dashboard run {login_seconds * 1e3:.0f} ms · full rerun {warm_seconds * 1e3:.0f} ms")
+    print(f"{'interaction':>14} {'rerun':>9} {'median':>9} {'p90':>9}")
+    medians = []
+    for name, (seconds, fragment) in timings.items():
+        seconds = sorted(seconds)
+        medians.append(statistics.median(seconds))
+        print(f"{name:>14} {'fragment' if fragment else 'full':>9} {medians[-1] * 1e3:>7.1f}ms "
+              f"{seconds[int(0.9 * (len(seconds) - 1))] * 1e3:>7.1f}ms")
+    print(f"{'all':>14} {'':>9} {statistics.median(medians) * 1e3:>7.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
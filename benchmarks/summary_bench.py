@@ -0,0 +1,78 @@
+import argparse
+from datetime import timedelta
+
+import numpy as np
+
+from benchmarks.filter_bench import best_of, pandas_filter
+from benchmarks.synthetic import VEHICLE_TYPES, synthetic_leads
+from filter_engine import LeadIndex
+from leads_data import LeadSnapshot
+from rollup import RollupCube, scan_summary
+
+# =========================
+# KPI and Chart Aggregation Benchmark
+# =========================
+# The dashboard's original aggregation chain (len, notna().sum(), mean(),
+# (Score > 3).sum(), an added Hour column + groupby, resample('D') and two
+# value_counts, each its own pass over the filtered frame) versus
+# rollup.scan_summary (filter + one bincount pass over the LeadIndex codes) and
+# the prefix-sum cube query. Run from the repo root:
+#
+#     python -m benchmarks.summary_bench --rows 10000 1000000
+
+
+def pandas_chain(filtered_df):
+    total_leads = len(filtered_df)
+    completion_rate = (filtered_df['Score'].notna().sum() / total_leads) * 100 if total_leads > 0 else 0
+    avg_score = filtered_df['Score'].mean()
+    high_quality = (filtered_df['Score'] > 3).sum() / total_leads * 100 if total_leads > 0 else 0
+    filtered_df['Hour'] = filtered_df['Timestamp'].dt.hour
+    hourly = filtered_df.groupby('Hour').size().reindex(range(24), fill_value=0)
+    daily = filtered_df.set_index('Timestamp').resample('D')['Score'].count()
+    scores = filtered_df['Score'].value_counts().sort_index()
+    vehicles = filtered_df['Vehicle Type'].value_counts()
+    return (total_leads, completion_rate, avg_score, high_quality), hourly, daily, scores, vehicles
+
+
+def check(expected, result):
+    (total_leads, _, avg_score, high_quality), hourly, daily, scores, vehicles = expected
+    assert result.total_leads == total_leads
+    assert np.isclose(result.avg_score, avg_score, equal_nan=True)
+    assert np.isclose(result.high_quality_rate, high_quality)
+    assert (result.hourly.to_numpy() == hourly.to_numpy()).all()
+    assert (result.daily.to_numpy() == daily.to_numpy()).all()
+    assert (result.scores.to_numpy() == scores.to_numpy()).all()
+    assert dict(result.vehicles) == dict(vehicles[vehicles > 0])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark KPI and chart aggregation per filter state.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    print(f"{'rows':>12} {'range':>6} {'matched':>10} {'filter+chain':>13} {'chain':>10} "
+          f"{'scan':>10} {'cube':>10} {'speedup':>8}")
+    for rows in args.rows:
+        df = synthetic_leads(rows)
+        vehicle_types = list(VEHICLE_TYPES)
+        index = LeadIndex(df)
+        cube = RollupCube().update(LeadSnapshot(frame=df, version=1, loaded_at=0))
+        last_day = df['Timestamp'].max().date()
+        for label, days in [("30d", 30), ("all", None)]:
+            first_day = df['Timestamp'].min().date() if days is None else last_day - timedelta(days=days - 1)
+            filters = (first_day, last_day, 3.0, 5.0, vehicle_types)
+
+            filtered, filtered_df = best_of(args.repeat, pandas_filter, df, *filters)
+            chain, expected = best_of(args.repeat, pandas_chain, filtered_df)
+            scan, result = best_of(args.repeat, scan_summary, index, *filters)
+            query, _ = best_of(args.repeat, cube.query, *filters)
+            check(expected, result)
+
+            before = filtered + chain
+            print(f"{rows:>12,} {label:>6} {len(filtered_df):>10,} {before * 1e3:>11.2f}ms {chain * 1e3:>8.2f}ms "
+                  f"{scan * 1e3:>8.2f}ms {query * 1e3:>8.2f}ms {before / scan:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
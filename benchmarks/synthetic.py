@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+
+# =========================
+# Synthetic Leads
+# =========================
+# Deterministic stand-in for the "Microfinance Leads" sheet, shaped like the
+# normalized frame dashboard.py works on.
+
+VEHICLE_TYPES = ["Motorbike", "Car", "Tuk Tuk", "Truck"]
+LOCATIONS = ["Nairobi", "Mombasa", "Kisumu", "Nakuru", "Eldoret", "Thika"]
+# Free-text form columns the real sheet carries alongside the schema columns
+TEXT_COLUMNS = ['Name', 'Phone', 'Location', 'Notes']
+SHEET_HEADER = ['Timestamp', 'Name', 'Phone', 'Location', 'Vehicle Type', 'Score', 'Notes']
+
+
+def synthetic_leads(rows, seed=0, days=730, missing_score_rate=0.1, text_columns=False):
+    """Normalized leads frame with `rows` leads spread over `days` days.
+
+    With `text_columns` the frame also carries TEXT_COLUMNS, as the sheet does.
+    """
+    rng = np.random.default_rng(seed)
+    start = np.datetime64('2024-01-01T00:00:00', 's')
+    # Append-only sheet: mostly chronological, with a little out-of-order jitter
+    offsets = np.sort(rng.integers(0, days * 86400, rows)) + rng.integers(-600, 600, rows)
+    scores = rng.integers(1, 6, rows).astype(np.float64)
+    scores[rng.random(rows) < missing_score_rate] = np.nan
+    frame = pd.DataFrame({
+        'Timestamp': pd.to_datetime(start + offsets.astype('timedelta64[s]')).astype('datetime64[ns]'),
+        'Vehicle Type': np.array(VEHICLE_TYPES, dtype=object)[rng.integers(0, len(VEHICLE_TYPES), rows)],
+        'Score': scores,
+    })
+    if text_columns:
+        ids = np.arange(rows).astype(str).astype(object)
+        frame['Name'] = "Lead " + ids
+        frame['Phone'] = "07" + pd.Series(rng.integers(0, 10 ** 8, rows)).astype(str).str.zfill(8).to_numpy(dtype=object)
+        frame['Location'] = np.array(LOCATIONS, dtype=object)[rng.integers(0, len(LOCATIONS), rows)]
+        # Mostly blank, like an optional comments field
+        frame['Notes'] = np.where(rng.random(rows) < 0.2, "Call back after " + ids, "")
+    return frame
+
+
+def sheet_values(frame, start=0, stop=None):
+    """Rows `start:stop` of a synthetic_leads(text_columns=True) frame as Sheets returns them.
+
+    Every cell is a string: ISO timestamps, integer scores, blanks for missing.
+    """
+    part = frame.iloc[start:stop]
+    scores = part['Score'].to_numpy()
+    columns = {
+        'Timestamp': np.datetime_as_string(part['Timestamp'].to_numpy(), unit='s').astype(object),
+        'Score': np.where(np.isnan(scores), "", np.nan_to_num(scores).astype(np.int64).astype(str)).astype(object),
+    }
+    return np.column_stack([columns[name] if name in columns else part[name].to_numpy(dtype=object)
+                            for name in SHEET_HEADER]).tolist() if len(part) else []
@@ -0,0 +1,63 @@
+import argparse
+import time
+
+from benchmarks.fake_sheets import FakeWorksheet
+from benchmarks.synthetic import synthetic_leads
+from leads_data import LeadStore
+from sheets_sync import IncrementalSheetLoader
+from tenants import AllTenantsLoader, Tenant
+
+# =========================
+# All-Tenants Load Benchmark
+# =========================
+# Cold load of the admin "All tenants" view: every tenant sheet fetched one
+# after another versus through AllTenantsLoader's bounded pool. Each
+# FakeWorksheet request sleeps --latency seconds to stand in for the Sheets API
+# round trip, so the pooled time should track the slowest sheet, not the sum.
+# Run from the repo root:
+#
+#     python -m benchmarks.tenants_bench --tenants 8 --latency 0.5
+
+
+def tenant_stores(tenants, rows, latency, seed):
+    """{tenant: LeadStore} over offline worksheets; sheet i holds rows * (i + 1) leads."""
+    stores = {}
+    for i, tenant in enumerate(tenants):
+        frame = synthetic_leads(rows * (i + 1), seed=seed + i, text_columns=True)
+        worksheet = FakeWorksheet(frame, latency=latency)
+        stores[tenant] = LeadStore(IncrementalSheetLoader(lambda worksheet=worksheet: worksheet))
+    return stores
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark serial vs pooled loading of every tenant sheet.")
+    parser.add_argument("--tenants", type=int, default=8)
+    parser.add_argument("--rows", type=int, default=5_000, help="leads in the smallest sheet")
+    parser.add_argument("--latency", type=float, default=0.5, help="seconds per simulated Sheets request")
+    parser.add_argument("--workers", type=int, default=None, help="pool size (default: LABX_TENANT_WORKERS)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    tenants = [Tenant(spreadsheet_name=f"Tenant {i}") for i in range(args.tenants)]
+
+    stores = tenant_stores(tenants, args.rows, args.latency, args.seed)
+    started = time.perf_counter()
+    for tenant in tenants:
+        stores[tenant].get()
+    serial = time.perf_counter() - started
+
+    stores = tenant_stores(tenants, args.rows, args.latency, args.seed)
+    options = {"workers": args.workers} if args.workers else {}
+    loader = AllTenantsLoader(tenants, store_for=stores.get, **options)
+    started = time.perf_counter()
+    frame = loader()
+    pooled = time.perf_counter() - started
+    slowest = max(loader.fetch_seconds.values())
+
+    print(f"{len(tenants)} tenants, {len(frame):,} leads, {args.latency:.2f}s per request")
+    print(f"{'serial':>8} {serial:>8.2f}s")
+    print(f"{'pooled':>8} {pooled:>8.2f}s  (slowest sheet {slowest:.2f}s, {serial / pooled:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
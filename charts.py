@@ -0,0 +1,157 @@
+import hashlib
+import threading
+import time
+from dataclasses import dataclass
+
+import pandas as pd
+import plotly.express as px
+
+from metrics import metrics
+from timeline import WEBGL_THRESHOLD
+from results_cache import ResultsCache
+
+# =========================
+# Dashboard Charts
+# =========================
+# Builders for the four dashboard figures, a shared dark layout, and a
+# process-wide cache per LeadStore keyed on (chart, hash of the aggregated
+# frame). An unchanged chart reuses its Figure instead of re-running Plotly
+# Express, which dominates render time for these small frames. Each store
+# (tenant, or the All-tenants view) has its own cache, so a busy one cannot
+# evict another's figures.
+
+# Chart Palette (White & Gray)
+PALETTE = ["#FFFFFF", "#D3D3D3", "#A9A9A9", "#808080"]
+
+GRID = dict(showgrid=True, gridcolor="rgba(255,255,255,0.2)")
+DARK_LAYOUT = dict(
+    plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)",
+    font=dict(family="Segoe UI", size=14, color="#FFFFFF"),
+    xaxis=GRID,
+    yaxis=GRID,
+)
+
+
+def apply_dark_layout(fig, xaxis=None):
+    layout = dict(DARK_LAYOUT)
+    if xaxis:
+        layout['xaxis'] = dict(GRID, **xaxis)
+    fig.update_layout(**layout)
+    return fig
+
+
+def hourly_figure(hourly_counts):
+    # Hourly Leads (Smoothed Line Graph)
+    fig = px.line(
+        hourly_counts, x="Hour", y="Smoothed Count", markers=True,
+        color_discrete_sequence=["#FFFFFF"]
+    )
+    fig.update_traces(hovertemplate="Hour: %{x}:00<br>Count: %{y:.2f}")
+    return apply_dark_layout(fig, xaxis=dict(tickvals=list(range(24)), ticktext=[f"{h}:00" for h in range(24)]))
+
+
+def daily_figure(leads_over_time):
+    # Leads Over Time (per day/hour counts, or per-lead scores when drilled down)
+    webgl = len(leads_over_time) > WEBGL_THRESHOLD
+    render_mode = "webgl" if webgl else "auto"
+    if 'Score' in leads_over_time.columns:
+        fig = px.scatter(
+            leads_over_time, x='Timestamp', y='Score', render_mode=render_mode,
+            color_discrete_sequence=["#FFFFFF"]
+        )
+        fig.update_traces(hovertemplate="Time: %{x}<br>Score: %{y}")
+    else:
+        fig = px.line(
+            leads_over_time, x='Timestamp', y='Leads', markers=not webgl, render_mode=render_mode,
+            color_discrete_sequence=["#FFFFFF"]
+        )
+        fig.update_traces(hovertemplate="Date: %{x}<br>Leads: %{y}")
+        # Moving averages, when the per-day series carries them (see RollupCube.moving_averages)
+        add_line = fig.add_scattergl if webgl else fig.add_scatter
+        averages = [column for column in leads_over_time.columns if column.endswith("-day avg")]
+        for column, color in zip(averages, PALETTE[1:]):
+            add_line(x=leads_over_time['Timestamp'], y=leads_over_time[column], mode="lines", name=column,
+                     line=dict(color=color, dash="dot"), hovertemplate=f"Date: %{{x}}<br>{column}: %{{y:.1f}}<extra></extra>")
+    # Dragging selects a time window, which the dashboard re-queries at finer resolution
+    fig.update_layout(dragmode="select", selectdirection="h")
+    return apply_dark_layout(fig)
+
+
+def score_figure(score_counts):
+    # Lead Scores Distribution
+    fig = px.bar(
+        score_counts, x="Score", y="Count", text="Count",
+        color="Score", color_discrete_sequence=PALETTE
+    )
+    fig.update_traces(textposition="outside", hovertemplate="Score: %{x}<br>Count: %{y}")
+    return apply_dark_layout(fig)
+
+
+def vehicle_figure(vehicle_counts):
+    # Vehicle Type Breakdown
+    fig = px.bar(
+        vehicle_counts, x="Vehicle Type", y="Count", text="Count",
+        color="Vehicle Type", color_discrete_sequence=PALETTE
+    )
+    fig.update_traces(textposition="outside", hovertemplate="Vehicle: %{x}<br>Count: %{y}")
+    return apply_dark_layout(fig)
+
+
+BUILDERS = {
+    'hourly': hourly_figure,
+    'daily': daily_figure,
+    'scores': score_figure,
+    'vehicles': vehicle_figure,
+}
+
+
+@dataclass(frozen=True)
+class CachedFigure:
+    figure: object
+    build_seconds: float    # Plotly Express + layout
+
+
+def frame_digest(frame):
+    """Stable hash of a small aggregated frame (values, index and column names)."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr(list(frame.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(frame, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def build_figure(chart, frame):
+    started = time.perf_counter()
+    figure = BUILDERS[chart](frame)
+    seconds = time.perf_counter() - started
+    metrics.observe("chart_build", seconds, len(frame))
+    return CachedFigure(figure, seconds)
+
+
+FIGURE_CACHE_ENTRIES = 256
+# chart -> {"build": seconds of its cached figure, "render": seconds of the last send}
+last_timings = {}
+
+_figure_caches = {}
+_figure_caches_lock = threading.Lock()
+
+
+def get_figure_cache(store):
+    """Process-wide figure cache for `store`; kept across snapshots, since keys hash the data."""
+    with _figure_caches_lock:
+        cache = _figure_caches.get(id(store))
+        if cache is None:
+            cache = _figure_caches[id(store)] = ResultsCache(max_entries=FIGURE_CACHE_ENTRIES, versioned=False)
+        return cache
+
+
+def cached_figure(cache, chart, frame):
+    """The CachedFigure for `chart` over `frame` from `cache`, built only if this data is new."""
+    cached = cache.get_or_compute((chart, frame_digest(frame)), lambda: build_figure(chart, frame))
+    last_timings.setdefault(chart, {})["build"] = cached.build_seconds
+    return cached
+
+
+def record_render(chart, seconds):
+    """Note one st.plotly_chart call for `chart` (it serializes the figure to JSON on every send)."""
+    metrics.observe("chart_render", seconds)
+    last_timings.setdefault(chart, {})["render"] = seconds
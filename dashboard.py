@@ -1,14 +1,11 @@
 import streamlit as st
-import pandas as pd
-import gspread
-import json
 import os
-from google.oauth2.service_account import Credentials
-import plotly.express as px
+import time
 import streamlit_authenticator as stauth
 from datetime import datetime
-import yaml
-from yaml.loader import SafeLoader
+from zoneinfo import ZoneInfo
+from login_guard import get_login_guard, load_auth_config
+from metrics import metrics, rss_bytes, start_metrics_server
 
 # =========================
 # Page Config
@@ -144,40 +141,16 @@ st.markdown(
 # =========================
 # Authentication Setup
 # =========================
-# Check if running on Render
-is_render = os.getenv("RENDER") == "true"
-
-# Load config.yaml (local file or env var)
-if is_render:
-    config_yaml = os.getenv("CONFIG_YAML")
-    if not config_yaml:
-        st.error("CONFIG_YAML environment variable is missing on Render. Expected YAML content for authentication.")
-        st.stop()
-    try:
-        config = yaml.load("config.yaml", Loader=SafeLoader)
-        if not config:
-            raise ValueError("Parsed YAML is empty.")
-    except yaml.YAMLError as e:
-        st.error(f"Invalid YAML in CONFIG_YAML: {str(e)}. Check your YAML content in Render environment variables.")
-        st.stop()
-    except Exception as e:
-        st.error(f"Error parsing CONFIG_YAML: {str(e)}.")
-        st.stop()
-else:
-    try:
-        with open("config.yaml", "r") as f:
-            config = yaml.safe_load(f)
-        if not config:
-            raise ValueError("config.yaml is empty.")
-    except FileNotFoundError:
-        st.error("config.yaml not found in project root. Please create it with credentials, cookie, and preauthorized keys.")
-        st.stop()
-    except yaml.YAMLError as e:
-        st.error(f"Invalid YAML in config.yaml: {str(e)}.")
-        st.stop()
-    except Exception as e:
-        st.error(f"Error reading config.yaml: {str(e)}.")
-        st.stop()
+# Per-stage timings for the admin panel and /metrics (see metrics.py)
+start_metrics_server()
+auth_started = time.perf_counter()
+
+# Parsed once per process and re-read only when it changes (see login_guard.py)
+try:
+    config = load_auth_config()
+except ValueError as e:
+    st.error(str(e))
+    st.stop()
 
 # Validate config structure
 creds_dict = config.get("credentials", {})
@@ -205,29 +178,35 @@ try:
     )
 
     # Render login module
-    if st.session_state.get("authentication_status") is None:
+    if not st.session_state.get("authentication_status"):
         st.markdown('<div class="main">', unsafe_allow_html=True)
         st.markdown('<div class="login-card">', unsafe_allow_html=True)
         st.markdown("<h2>🔐 LabX</h2>", unsafe_allow_html=True)
         
-        login_result = authenticator.login(
-            location='main',
-            fields={
-                'Form name': 'Login',
-                'Username': 'Username',
-                'Password': 'Password',
-                'Login': 'Login'
-            }
-        )
-        
+        # Cookie re-authentication only; passwords are checked by the login guard
+        authenticator.login(location='unrendered')
+        if not st.session_state.get("authentication_status"):
+            with st.form("Login"):
+                st.subheader("Login")
+                login_username = st.text_input("Username", autocomplete="off")
+                login_password = st.text_input("Password", type="password", autocomplete="off")
+                submitted = st.form_submit_button("Login")
+            if submitted and login_username and login_password:
+                login_username = login_username.lower().strip()
+                outcome = get_login_guard().verify(creds_dict, login_username, login_password.strip(), st.context.ip_address)
+                if outcome.ok:
+                    authenticator.authentication_controller.login(token={"username": login_username})
+                    authenticator.cookie_controller.set_cookie()
+                elif outcome.status == "invalid":
+                    st.session_state["authentication_status"] = False
+                elif outcome.status == "limited":
+                    st.error(f"Too many login attempts. Try again in {outcome.retry_after} seconds.")
+                else:
+                    st.error("The server is busy verifying other logins. Please try again in a moment.")
+
         st.markdown("</div></div>", unsafe_allow_html=True)
-        if login_result:
-            name, authentication_status, username = login_result
-            st.session_state["authentication_status"] = authentication_status
-            st.session_state["name"] = name
-            st.session_state["username"] = username
-            if authentication_status:
-                st.rerun()
+        if st.session_state.get("authentication_status"):
+            st.rerun()
 
     authentication_status = st.session_state.get("authentication_status")
     name = st.session_state.get("name")
@@ -239,11 +218,14 @@ except KeyError as e:
 except Exception as e:
     st.error(f"Authentication setup error: {str(e)}. Verify streamlit-authenticator==0.4.2 and Streamlit>=1.30.0. Config keys: {list(config.keys()) if 'config' in locals() else 'N/A'}")
     authentication_status = False
+metrics.observe("auth", time.perf_counter() - auth_started)
 
 # =========================
 # Dynamic Greeting
 # =========================
-current_time = datetime.now().hour
+# Business time, as leads are bucketed (LABX_TIMEZONE, see leads_data.py)
+business_tz = ZoneInfo(os.getenv("LABX_TIMEZONE", "Africa/Nairobi"))
+current_time = datetime.now(business_tz).hour
 if current_time < 12:
     greeting = "Good Morning"
 elif 12 <= current_time < 16:
@@ -255,6 +237,24 @@ else:
 # Authenticated Dashboard
 # =========================
 if authentication_status:
+    # The analytics stack (pandas, Plotly, gspread, pyarrow, APScheduler) loads on
+    # the first authenticated run and stays in sys.modules, so the login page
+    # never pays for it. Check with: python import_report.py
+    import pandas as pd
+    from tenants import ALL_TENANTS, TENANT_COLUMN, all_tenants, all_tenants_store, tenant_for, tenant_store
+    from ingest_worker import format_age, get_worker
+    from results_cache import filter_key, get_results_cache
+    from rollup import SUMMARY_SOURCE, get_cube, query_summary
+    from memory_report import freeze_import_heap, memory_report
+    from charts import cached_figure, get_figure_cache, last_timings, record_render
+    from timeline import DOWNSAMPLE_METHOD, RESOLUTIONS, downsample, timeline_series, zoom_resolution
+    from filter_engine import get_filter_index, session_view
+    from lead_export import EXPORT_COLUMNS, EXPORT_FORMATS, EXPORT_INLINE_MAX_BYTES, export_url, spool_export
+    from pdf_report import build_report, get_report_queue
+    # Keeps Streamlit's full GC after every rerun from re-walking those modules
+    freeze_import_heap()
+
+    rerun_started = time.perf_counter()
     st.sidebar.markdown("LabX Dashboard")
     logout_result = authenticator.logout('Logout', 'sidebar')
     if logout_result:
@@ -262,173 +262,279 @@ if authentication_status:
     st.header(f"{greeting} {name}")
 
     # ------------------------- 
-    # Google Sheets setup
+    # Load Data (shared across sessions per tenant, see leads_data.py and tenants.py)
     # ------------------------- 
-    SCOPES = ['https://www.googleapis.com/auth/spreadsheets', 'https://www.googleapis.com/auth/drive']
-    # Load Google Sheets credentials (local file or env var)
-    if is_render:
-        google_creds_json = os.getenv("GOOGLE_SHEETS_CREDENTIALS")
-        if not google_creds_json:
-            st.error("GOOGLE_SHEETS_CREDENTIALS environment variable is missing on Render. Expected JSON content for Google Service Account.")
-            st.stop()
-        try:
-            google_creds = json.loads('credentials.json')
-        except json.JSONDecodeError as e:
-            st.error(f"Invalid JSON in GOOGLE_SHEETS_CREDENTIALS: {str(e)}. Check your JSON content in Render environment variables.")
-            st.stop()
+    try:
+        tenant = tenant_for(config, username)
+        tenants = all_tenants(config) if "admin" in (st.session_state.get("roles") or []) else [tenant]
+    except ValueError as e:
+        st.error(str(e))
+        st.stop()
+    tenant_names = [ALL_TENANTS] + [t.name for t in tenants] if len(tenants) > 1 else []
+    selected_tenant = tenant.name
+    if tenant_names:
+        selected_tenant = st.sidebar.selectbox("Tenant", tenant_names,
+                                               index=tenant_names.index(tenant.name) if tenant.name in tenant_names else 0)
+    if selected_tenant == ALL_TENANTS:
+        lead_store = all_tenants_store(tenants)
     else:
-        try:
-            with open("credentials.json", "r") as f:
-                google_creds = json.load(f)
-        except FileNotFoundError:
-            st.error("credentials.json not found in project root. Please create it with Google Service Account credentials.")
-            st.stop()
-        except json.JSONDecodeError as e:
-            st.error(f"Invalid JSON in credentials.json: {str(e)}.")
-            st.stop()
-        except Exception as e:
-            st.error(f"Error reading credentials.json: {str(e)}.")
-            st.stop()
-
-    # Create credentials
-    creds = Credentials.from_service_account_info(google_creds, scopes=SCOPES)
-
-    gc = gspread.authorize(creds)
-    sheet = gc.open("Microfinance Leads").sheet1
+        lead_store = tenant_store(next((t for t in tenants if t.name == selected_tenant), tenant))
+    # Per-session state below refers to one store's data versions
+    if st.session_state.get("tenant_view") != selected_tenant:
+        for state_key in ("lead_view", "export", "timeline_zoom"):
+            st.session_state.pop(state_key, None)
+        st.session_state["tenant_view"] = selected_tenant
 
-    # ------------------------- 
-    # Load Data
-    # ------------------------- 
-    data = sheet.get_all_records()
-    df = pd.DataFrame(data)
-    df['Timestamp'] = pd.to_datetime(df['Timestamp'], format='ISO8601')
-    df['Score'] = pd.to_numeric(df['Score'], errors='coerce')
+    ingest_worker = get_worker(lead_store)
+    refresh = st.sidebar.button("Refresh data")
+    try:
+        if refresh:
+            if selected_tenant == ALL_TENANTS:
+                lead_store.loader.load(force=True)
+            elif hasattr(lead_store.loader, "invalidate"):
+                # Fetch even if the sheet's change signal says nothing changed
+                lead_store.loader.invalidate()
+            snapshot = lead_store.refresh()
+        elif ingest_worker is not None and lead_store.snapshot is not None:
+            # The background worker keeps the snapshot current; never fetch inline
+            snapshot = lead_store.snapshot
+        else:
+            snapshot = lead_store.get()
+    except Exception as e:
+        st.error(f"Could not load leads from Google Sheets: {str(e)}")
+        st.stop()
+    if ingest_worker is not None:
+        health = ingest_worker.health()
+        skips = health["skips"]
+        unchanged = f" · {skips} of {skips + health['fetches']} refreshes unchanged" if skips is not None else ""
+        st.sidebar.caption(f"Last sync {format_age(health['age_seconds'])} · {snapshot.row_count} leads{unchanged}")
+        if health["stale"] and health["last_error"]:
+            st.sidebar.warning(f"Data may be stale; last sync failed: {health['last_error']}")
+    else:
+        if lead_store.last_error is not None:
+            st.sidebar.warning(f"Showing cached data; last refresh failed: {lead_store.last_error}")
+        st.sidebar.caption(f"Data as of {datetime.fromtimestamp(snapshot.loaded_at):%Y-%m-%d %H:%M:%S} ({snapshot.row_count} leads)")
+    if selected_tenant == ALL_TENANTS:
+        tenant_loader = lead_store.loader
+        for failed, error in tenant_loader.errors.items():
+            st.sidebar.warning(f"{failed} left out; loading it failed: {error}")
+        if tenant_loader.last_load_seconds is not None:
+            slowest = max(tenant_loader.fetch_seconds.values(), default=0.0)
+            st.sidebar.caption(f"{len(tenant_loader.fetch_seconds)} tenants loaded in {tenant_loader.last_load_seconds:.2f}s "
+                               f"(slowest {slowest:.2f}s)")
 
     # ------------------------- 
-    # Filters
+    # Filters, KPIs, Charts, Report and Export
     # ------------------------- 
-    st.sidebar.subheader("Filter Options")
-    with st.sidebar.expander("Date & Score", expanded=False):
-        today = pd.to_datetime('today').date()
-        default_min_date = df['Timestamp'].min().date() if not df.empty else today
-        default_max_date = min(df['Timestamp'].max().date(), today) if not df.empty else today
-        date_range = st.date_input("Date Range", [default_min_date, default_max_date], max_value=today)
-        min_score, max_score = st.slider("Score Range", 0.0, 5.0, (0.0, 5.0))
-
-    with st.sidebar.expander("Vehicle Type", expanded=False):
-        vehicle_types = st.multiselect("Vehicle Types", options=df['Vehicle Type'].unique(), default=df['Vehicle Type'].unique())
-
-    # Handle single date or range
-    start_date = date_range[0] if isinstance(date_range, (list, tuple)) and len(date_range) > 0 else date_range
-    end_date = date_range[-1] if isinstance(date_range, (list, tuple)) and len(date_range) > 1 else date_range
-
-    mask = (
-        (df['Timestamp'].dt.date >= start_date) &
-        (df['Timestamp'].dt.date <= end_date) &
-        (df['Score'].between(min_score, max_score)) &
-        (df['Vehicle Type'].isin(vehicle_types))
-    )
-    filtered_df = df[mask].copy()
+    # All of this runs as one fragment: changing a filter reruns only this
+    # function, not the CSS, auth, greeting and data loading above. Widgets that
+    # affect a single panel (timeline resolution and zoom, report, export) sit
+    # in nested fragments and rerun only that panel.
+    results_cache = get_results_cache(lead_store)
+    figure_cache = get_figure_cache(lead_store)
 
-    # ------------------------- 
-    # KPIs
-    # ------------------------- 
-    total_leads = len(filtered_df)
-    completion_rate = (filtered_df['Score'].notna().sum() / total_leads) * 100 if total_leads > 0 else 0
-    avg_score = filtered_df['Score'].mean()
-    high_quality = (filtered_df['Score'] > 3).sum() / total_leads * 100 if total_leads > 0 else 0
-
-    col1, col2 = st.columns(2)
-    with col1:
-        st.metric("Total Leads", total_leads)
-        st.metric("Avg. Lead Score", f"{avg_score:.1f}/5")
-    with col2:
-        st.metric("Completion Rate", f"{completion_rate:.1f}%")
-        st.metric("High-Quality Leads", f"{high_quality:.1f}%")
+    def plot_chart(chart, figure, **kwargs):
+        started = time.perf_counter()
+        event = st.plotly_chart(figure, use_container_width=True, **kwargs)
+        record_render(chart, time.perf_counter() - started)
+        return event
+    report_queue = get_report_queue(lead_store)
 
-    # ------------------------- 
-    # Chart Palette (White & Gray)
-    # ------------------------- 
-    palette = ["#FFFFFF", "#D3D3D3", "#A9A9A9", "#808080"]
+    @st.fragment
+    def analytics(snapshot):
+        fragment_started = time.perf_counter()
+        if ingest_worker is not None and lead_store.snapshot is not None:
+            # Pick up leads the worker published since the last full run
+            snapshot = lead_store.snapshot
+        cube = get_cube(lead_store, snapshot)
 
-    # ------------------------- 
-    # Hourly Leads (Smoothed Line Graph)
-    # ------------------------- 
-    st.subheader("Hourly Leads")
-    filtered_df['Hour'] = filtered_df['Timestamp'].dt.hour
-    hourly_counts = filtered_df.groupby('Hour').size().reindex(range(24), fill_value=0).reset_index(name='Count')
-    hourly_counts['Hour'] = hourly_counts['Hour'].astype(int)
-    # Apply 3-hour rolling average for smoothing
-    hourly_counts['Smoothed Count'] = hourly_counts['Count'].rolling(window=3, center=True, min_periods=1).mean()
-    fig4 = px.line(
-        hourly_counts, x="Hour", y="Smoothed Count", markers=True,
-        color_discrete_sequence=["#FFFFFF"]
-    )
-    fig4.update_traces(hovertemplate="Hour: %{x}:00<br>Count: %{y:.2f}")
-    fig4.update_layout(
-        plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)",
-        font=dict(family="Segoe UI", size=14, color="#FFFFFF"),
-        xaxis=dict(showgrid=True, gridcolor="rgba(255,255,255,0.2)", tickvals=list(range(24)), ticktext=[f"{h}:00" for h in range(24)]),
-        yaxis=dict(showgrid=True, gridcolor="rgba(255,255,255,0.2)")
-    )
-    st.plotly_chart(fig4, use_container_width=True)
+        with st.expander("Filter Options", expanded=True):
+            date_column, score_column, vehicle_column = st.columns([2, 2, 3])
+            today = datetime.now(business_tz).date()
+            default_min_date = cube.first_day if snapshot.row_count else today
+            default_max_date = min(cube.last_day, today) if snapshot.row_count else today
+            date_range = date_column.date_input("Date Range", [default_min_date, default_max_date], max_value=today)
+            min_score, max_score = score_column.slider("Score Range", 0.0, 5.0, (0.0, 5.0))
+            vehicle_types = vehicle_column.multiselect("Vehicle Types", options=cube.vehicle_types, default=cube.vehicle_types)
 
-    # ------------------------- 
-    # Leads Over Time
-    # ------------------------- 
-    st.subheader("Leads Over Time")
-    leads_over_time = filtered_df.set_index('Timestamp').resample('D')['Score'].count().reset_index()
-    leads_over_time.columns = ['Timestamp', 'Leads']
-    fig3 = px.line(
-        leads_over_time, x='Timestamp', y='Leads', markers=True,
-        color_discrete_sequence=["#FFFFFF"]
-    )
-    fig3.update_traces(hovertemplate="Date: %{x}<br>Leads: %{y}")
-    fig3.update_layout(
-        plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)",
-        font=dict(family="Segoe UI", size=14, color="#FFFFFF"),
-        xaxis=dict(showgrid=True, gridcolor="rgba(255,255,255,0.2)"),
-        yaxis=dict(showgrid=True, gridcolor="rgba(255,255,255,0.2)")
-    )
-    st.plotly_chart(fig3, use_container_width=True)
+        # Handle single date or range
+        start_date = date_range[0] if isinstance(date_range, (list, tuple)) and len(date_range) > 0 else date_range
+        end_date = date_range[-1] if isinstance(date_range, (list, tuple)) and len(date_range) > 1 else date_range
+        filters = (start_date, end_date, min_score, max_score, vehicle_types)
 
-    # ------------------------- 
-    # Lead Scores Distribution
-    # ------------------------- 
-    st.subheader("Lead Scores Distribution")
-    score_counts = filtered_df['Score'].value_counts().sort_index().reset_index()
-    score_counts.columns = ['Score', 'Count']
-    fig1 = px.bar(
-        score_counts, x="Score", y="Count", text="Count",
-        color="Score", color_discrete_sequence=palette
-    )
-    fig1.update_traces(textposition="outside", hovertemplate="Score: %{x}<br>Count: %{y}")
-    fig1.update_layout(
-        plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)",
-        font=dict(family="Segoe UI", size=14, color="#FFFFFF"),
-        xaxis=dict(showgrid=True, gridcolor="rgba(255,255,255,0.2)"),
-        yaxis=dict(showgrid=True, gridcolor="rgba(255,255,255,0.2)")
-    )
-    st.plotly_chart(fig1, use_container_width=True)
+        # ------------------------- 
+        # KPIs (summed from the rollup cube, or one scan of the filter index with
+        # LABX_SUMMARY_SOURCE=scan; see rollup.py)
+        # ------------------------- 
+        # Same filters on the same data version are served from the results cache
+        key = filter_key(cube.version, start_date, end_date, min_score, max_score, vehicle_types)
+
+        def compute_summary():
+            index = get_filter_index(lead_store, snapshot) if SUMMARY_SOURCE == "scan" else None
+            return query_summary(cube, *filters, index=index)
+
+        (total_leads, completion_rate, avg_score, high_quality), frames = results_cache.get_or_compute(key, compute_summary)
+
+        # Trailing weeks up to the selected end date, from the same prefix sums as the KPIs
+        trends = results_cache.get_or_compute(key + ("trends",), lambda: cube.trends(*filters))
+
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Total Leads", total_leads)
+            st.metric("Avg. Lead Score", f"{avg_score:.1f}/5")
+        with col2:
+            st.metric("Completion Rate", f"{completion_rate:.1f}%")
+            st.metric("High-Quality Leads", f"{high_quality:.1f}%")
+        with col3:
+            week_over_week = trends.week_over_week
+            st.metric("Leads, Last 7 Days", trends.last_7,
+                      delta=f"{week_over_week:+.1f}% WoW" if week_over_week is not None else None)
+            st.metric("Daily Avg. (7d / 28d)", f"{trends.avg_7:.1f} / {trends.avg_28:.1f}")
+
+        # ------------------------- 
+        # Charts (figures cached per aggregated data, see charts.py)
+        # ------------------------- 
+        @st.fragment
+        def timeline_panel():
+            # Downsampled, zoomable Leads Over Time (see timeline.py)
+            zoom = st.session_state.get("timeline_zoom")
+            controls = st.columns([4, 1])
+            if zoom is None:
+                resolution = controls[0].radio("Resolution", RESOLUTIONS, horizontal=True, key="timeline_resolution")
+            else:
+                resolution = zoom_resolution(*zoom)
+                controls[0].caption(f"Zoomed to {zoom[0]:%Y-%m-%d %H:%M} - {zoom[1]:%Y-%m-%d %H:%M} · per {resolution.lower()}")
+                if controls[1].button("Reset zoom"):
+                    del st.session_state["timeline_zoom"]
+                    st.rerun(scope="fragment")
+
+            def compute_timeline():
+                series = timeline_series(lead_store, snapshot, cube, resolution, filters, zoom)
+                return downsample(series), len(series)
+
+            points, total_points = results_cache.get_or_compute(key + ("timeline", resolution, zoom), compute_timeline)
+            figure = cached_figure(figure_cache, 'daily', points).figure
+            # A fresh key per zoom level, so the previous selection does not re-apply
+            event = plot_chart('daily', figure, on_select="rerun", selection_mode="box", key=f"timeline_chart_{zoom}")
+            if len(points) < total_points:
+                st.caption(f"Showing {len(points):,} of {total_points:,} points ({DOWNSAMPLE_METHOD.upper()})")
+            boxes = event.selection.get("box", []) if event else []
+            if boxes and boxes[0].get("x"):
+                st.session_state["timeline_zoom"] = tuple(sorted(pd.Timestamp(value) for value in boxes[0]["x"]))
+                st.rerun(scope="fragment")
+
+        for chart, title in [
+            ('hourly', "Hourly Leads"),
+            ('daily', "Leads Over Time"),
+            ('scores', "Lead Scores Distribution"),
+            ('vehicles', "Vehicle Type Breakdown"),
+        ]:
+            st.subheader(title)
+            if chart == 'daily':
+                timeline_panel()
+                continue
+            figure = cached_figure(figure_cache, chart, frames[chart]).figure
+            plot_chart(chart, figure)
+
+        # ------------------------- 
+        # PDF Report (built on a worker pool and cached per filter state, see pdf_report.py)
+        # ------------------------- 
+        report_kpis = (total_leads, completion_rate, avg_score, high_quality)
+        report_polling = report_queue.is_pending(key)
+
+        # Polls only while a build for these filters is running
+        @st.fragment(run_every=1 if report_polling else None)
+        def report_panel():
+            report = report_queue.get(key)
+            if report is not None:
+                if report_polling:
+                    st.rerun()  # stop polling
+                st.download_button("Download report", report, file_name=f"labx_report_{start_date}_{end_date}.pdf",
+                                   mime="application/pdf", on_click="ignore")
+            elif report_queue.is_pending(key):
+                st.caption("Building report...")
+            else:
+                error = report_queue.error(key)
+                if error is not None:
+                    if report_polling:
+                        st.rerun()  # stop polling
+                    st.error(f"Could not build the report: {error}")
+                if st.button("Prepare PDF report"):
+                    report_queue.request(key, lambda: build_report(report_kpis, frames, filters))
+                    st.rerun()  # start polling
+
+        # ------------------------- 
+        # Export (streamed to a temp file a chunk at a time, see lead_export.py).
+        # st.download_button holds its data in memory on every rerun, so only
+        # small files use it; larger ones get a one-time link to api.py.
+        # ------------------------- 
+        @st.fragment
+        def export_panel():
+            export_format = st.radio("Format", list(EXPORT_FORMATS), horizontal=True)
+            column_options = EXPORT_COLUMNS + ([TENANT_COLUMN] if TENANT_COLUMN in snapshot.frame.columns else [])
+            export_columns = st.multiselect("Columns", column_options, default=column_options)
+            export_state = (key, export_format, tuple(export_columns))
+            export = st.session_state.get("export")
+            if st.button("Prepare export", disabled=not export_columns):
+                view = session_view(st.session_state, lead_store, snapshot, key, filters)
+                path = spool_export(snapshot.frame, view.positions, export_format, export_columns)
+                if export is not None and os.path.exists(export[1]):
+                    os.remove(export[1])
+                export = st.session_state["export"] = (export_state, path)
+            if export is not None and export[0] == export_state and os.path.exists(export[1]):
+                extension, mime = EXPORT_FORMATS[export_format]
+                file_name = f"labx_leads_{start_date}_{end_date}.{extension}"
+                if os.path.getsize(export[1]) <= EXPORT_INLINE_MAX_BYTES:
+                    with open(export[1], "rb") as f:
+                        st.download_button(f"Download {export_format}", f, file_name=file_name, mime=mime, on_click="ignore")
+                else:
+                    st.link_button(f"Download {export_format}", export_url(export[1], file_name))
+                    st.caption("The link works once; prepare the export again to download it again.")
+
+        st.subheader("Report & Export")
+        report_column, export_column = st.columns([1, 2])
+        with report_column:
+            report_panel()
+        with export_column:
+            export_panel()
+        metrics.observe("analytics", time.perf_counter() - fragment_started)
+
+    analytics(snapshot)
+
+    # Sidebar panels below refresh on full reruns
+    stats = results_cache.stats()
+    st.sidebar.caption(f"Results cache: {stats['hits']} hits / {stats['misses']} misses · {stats['entries']} entries · {stats['bytes'] / 1024:.0f} KB")
+    with st.sidebar.expander("Memory", expanded=False):
+        report = memory_report(lead_store, st.session_state)
+        st.caption(f"Shared by all sessions: {report['shared_total'] / 1024 / 1024:.1f} MB")
+        st.caption(" · ".join(f"{part} {size / 1024:.0f} KB" for part, size in report['shared'].items()))
+        sessions = report['active_sessions']
+        st.caption(f"This session: {report['per_session_total'] / 1024:.1f} KB" + (f" · {sessions} active sessions" if sessions else ""))
+
+    with st.sidebar.expander("Chart timings", expanded=False):
+        for chart, timings in last_timings.items():
+            render = f" · render {timings['render'] * 1000:.1f} ms" if "render" in timings else ""
+            st.caption(f"{chart}: build {timings['build'] * 1000:.1f} ms{render}")
+        figure_stats = figure_cache.stats()
+        st.caption(f"Figure cache: {figure_stats['hits']} hits / {figure_stats['misses']} misses")
+
+    metrics.observe("rerun", time.perf_counter() - rerun_started)
 
     # ------------------------- 
-    # Vehicle Type Breakdown
+    # Performance (admins only)
     # ------------------------- 
-    st.subheader("Vehicle Type Breakdown")
-    vehicle_counts = filtered_df['Vehicle Type'].value_counts().reset_index()
-    vehicle_counts.columns = ["Vehicle Type", "Count"]
-    fig2 = px.bar(
-        vehicle_counts, x="Vehicle Type", y="Count", text="Count",
-        color="Vehicle Type", color_discrete_sequence=palette
-    )
-    fig2.update_traces(textposition="outside", hovertemplate="Vehicle: %{x}<br>Count: %{y}")
-    fig2.update_layout(
-        plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)",
-        font=dict(family="Segoe UI", size= 14, color="#FFFFFF"),
-        xaxis=dict(showgrid=True, gridcolor="rgba(255,255,255,0.2)"),
-        yaxis=dict(showgrid=True, gridcolor="rgba(255,255,255,0.2)")
-    )
-    st.plotly_chart(fig2, use_container_width=True)
+    metrics.register_cache("results", results_cache)
+    metrics.register_cache("figures", figure_cache)
+    metrics.register_cache("reports", report_queue.reports)
+    if "admin" in (st.session_state.get("roles") or []):
+        with st.sidebar.expander("Performance", expanded=False):
+            for stage in metrics.stage_summary():
+                rows = f" · {stage['rows']:,} rows" if stage['rows'] else ""
+                st.caption(f"{stage['stage']}: last {stage['last'] * 1000:.1f} ms · p50 {stage['p50'] * 1000:.1f} ms · "
+                           f"p99 {stage['p99'] * 1000:.1f} ms · {stage['count']} runs{rows}")
+            for cache, cache_stats in metrics.cache_summary().items():
+                st.caption(f"{cache} cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses · {cache_stats['entries']} entries")
+            st.caption(f"RSS {rss_bytes() / 1024 / 1024:.0f} MB")
 
 elif authentication_status is False:
     st.error('Username/password is incorrect')
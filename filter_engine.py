@@ -0,0 +1,128 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from leads_data import LeadView, time_columns
+
+# =========================
+# Vectorized Filter Engine
+# =========================
+# Precomputes, once per snapshot, the arrays the dashboard filters test:
+# the ingest-time int32 local day (days since 1970-01-01) and int codes for
+# Vehicle Type, both sorted by Timestamp (plus local hours and score codes for
+# rollup.scan_summary). A date range is then a searchsorted slice and the
+# score/vehicle predicates are plain NumPy ops on that slice, with no per-row
+# Python `date` objects and no object-dtype `isin`.
+
+_EPOCH_DAY = np.datetime64('1970-01-01', 'D')
+
+
+def day_ordinal(value):
+    """Days since 1970-01-01 for a date/datetime/Timestamp."""
+    return int((np.datetime64(pd.Timestamp(value).date(), 'D') - _EPOCH_DAY).astype(np.int64))
+
+
+class LeadIndex:
+    """Time-sorted filter arrays for one leads frame."""
+
+    def __init__(self, frame):
+        timestamps = frame['Timestamp']
+        if getattr(timestamps.dt, 'tz', None) is not None:
+            timestamps = timestamps.dt.tz_convert('UTC').dt.tz_localize(None)
+        nanos = timestamps.to_numpy(dtype='datetime64[ns]').view(np.int64)
+        times = time_columns(frame)
+        days = times['Local Day']
+
+        self.order = np.argsort(nanos, kind='stable')
+        self.days = days[self.order]
+        if np.any(self.days[1:] < self.days[:-1]):
+            # A zone whose clocks fall back across midnight: order by local day first
+            self.order = np.lexsort((nanos, days))
+            self.days = days[self.order]
+
+        self.hours = times['Local Hour'][self.order]
+        self.scores = frame['Score'].to_numpy(dtype=np.float64, na_value=np.nan)[self.order]
+        # Distinct score values (NaN last) and each lead's position among them
+        self.score_values, self.score_codes = np.unique(self.scores, return_inverse=True)
+        self.score_codes = self.score_codes.astype(np.int32)
+
+        vehicles = frame['Vehicle Type']
+        if isinstance(vehicles.dtype, pd.CategoricalDtype):
+            codes, categories = vehicles.cat.codes.to_numpy(), vehicles.cat.categories
+        else:
+            codes, categories = pd.factorize(vehicles, use_na_sentinel=True)
+        # Shift by one so missing vehicles (code -1) index slot 0 of the lookup table
+        self.vehicle_codes = (codes.astype(np.int32) + 1)[self.order]
+        self.vehicle_categories = pd.Index(categories)
+
+    def __len__(self):
+        return len(self.order)
+
+    @property
+    def nbytes(self):
+        return (self.order.nbytes + self.days.nbytes + self.hours.nbytes + self.scores.nbytes
+                + self.score_codes.nbytes + self.vehicle_codes.nbytes)
+
+    def date_slice(self, start_date, end_date):
+        return self.day_slice(day_ordinal(start_date), day_ordinal(end_date))
+
+    def day_slice(self, first_day, last_day):
+        """Sorted positions of the leads on day ordinals first_day..last_day."""
+        lo = np.searchsorted(self.days, first_day, side='left')
+        hi = np.searchsorted(self.days, last_day, side='right')
+        return slice(lo, hi)
+
+    def vehicle_lookup(self, vehicle_types):
+        wanted = np.zeros(len(self.vehicle_categories) + 1, dtype=bool)
+        codes = self.vehicle_categories.get_indexer(list(vehicle_types))
+        wanted[codes[codes >= 0] + 1] = True
+        wanted[0] = any(pd.isna(vehicle) for vehicle in vehicle_types)
+        return wanted
+
+    def match(self, window, min_score, max_score, vehicle_types):
+        """Boolean mask over the `window` slice for the score and vehicle filters."""
+        scores = self.scores[window]
+        keep = (scores >= min_score) & (scores <= max_score)
+        keep &= self.vehicle_lookup(vehicle_types)[self.vehicle_codes[window]]
+        return keep
+
+    def select(self, start_date, end_date, min_score, max_score, vehicle_types):
+        """Frame positions of matching leads, in Timestamp order."""
+        window = self.date_slice(start_date, end_date)
+        return self.order[window][self.match(window, min_score, max_score, vehicle_types)]
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_filter_index(store, snapshot):
+    """LeadIndex for `snapshot`, built once per snapshot version and shared by sessions."""
+    key = id(store)
+    with _indexes_lock:
+        cached = _indexes.get(key)
+        if cached is not None and cached[0] == snapshot.version:
+            return cached[1]
+        index = LeadIndex(snapshot.frame)
+        _indexes[key] = (snapshot.version, index)
+        return index
+
+
+def cached_filter_index(store):
+    """The LeadIndex last built for `store`, or None (never builds one)."""
+    cached = _indexes.get(id(store))
+    return cached[1] if cached is not None else None
+
+
+def session_view(session_state, store, snapshot, key, filters):
+    """The session's LeadView for `key`, reselected only when the key changes.
+
+    `key` is a `results_cache.filter_key` (so it starts with the data version)
+    and `filters` the matching LeadIndex.select arguments.
+    """
+    view = session_state.get("lead_view")
+    if view is None or view.key != key:
+        positions = get_filter_index(store, snapshot).select(*filters)
+        view = session_state["lead_view"] = LeadView(key=key, positions=positions)
+    return view
@@ -0,0 +1,83 @@
+import argparse
+import subprocess
+import sys
+
+# =========================
+# Import-Time Report
+# =========================
+# Per-module import cost of the two startup stages, measured with
+# `python -X importtime` in a fresh interpreter:
+#
+#     login      what every visitor loads to see the login form
+#     dashboard  what the first authenticated run adds on top
+#
+#     python import_report.py                       # both stages, top 15 each
+#     python import_report.py --budget-ms login=400 # exit 1 if over budget
+
+STAGES = {
+    "login": ["streamlit", "streamlit_authenticator", "login_guard"],
+    "dashboard": ["pandas", "leads_data", "sheets_client", "ingest_worker", "tenants",
+                  "results_cache", "rollup", "memory_report", "charts", "timeline", "filter_engine",
+                  "lead_export", "pdf_report"],
+}
+
+
+def import_times(modules, preload=()):
+    """{module: (self_us, cumulative_us)} for importing `modules` after `preload`."""
+    code = "".join(f"import {name}\n" for name in preload)
+    code += "import sys; sys.stderr.write('--- measured ---\\n')\n"
+    code += "".join(f"import {name}\n" for name in modules)
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    measured = result.stderr.split("--- measured ---\n", 1)[1]
+
+    times = {}
+    for line in measured.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def stage_report(stage, top):
+    """(total_ms, [(package, cumulative_ms)]) for one stage, heaviest first."""
+    preload = []
+    for name, modules in STAGES.items():
+        if name == stage:
+            break
+        preload += modules
+    times = import_times(STAGES[stage], preload)
+    total_us = sum(self_us for self_us, _ in times.values())
+    # Top-level packages only; submodules are already inside their cumulative time
+    packages = [(name, cumulative_us / 1000) for name, (_, cumulative_us) in times.items() if "." not in name]
+    packages.sort(key=lambda item: item[1], reverse=True)
+    return total_us / 1000, packages[:top]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report per-module import cost of the dashboard's startup stages.")
+    parser.add_argument("--stage", dest="stages", action="append", choices=list(STAGES),
+                        help="stage to report (repeatable; default: all)")
+    parser.add_argument("--top", type=int, default=15, help="packages to list per stage")
+    parser.add_argument("--budget-ms", action="append", default=[], metavar="STAGE=MS",
+                        help="fail if a stage's import time exceeds MS (repeatable)")
+    args = parser.parse_args(argv)
+    budgets = {stage: float(ms) for stage, ms in (item.split("=", 1) for item in args.budget_ms)}
+
+    over_budget = False
+    for stage in args.stages or list(STAGES):
+        total_ms, packages = stage_report(stage, args.top)
+        budget = budgets.get(stage)
+        status = "" if budget is None else (" (over budget)" if total_ms > budget else f" (budget {budget:.0f} ms)")
+        over_budget |= budget is not None and total_ms > budget
+        print(f"{stage}: {total_ms:.0f} ms{status}")
+        for name, cumulative_ms in packages:
+            print(f"  {cumulative_ms:>8.1f} ms  {name}")
+    return 1 if over_budget else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,142 @@
+import argparse
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.schedulers.blocking import BlockingScheduler
+
+from snapshot_store import SNAPSHOT_PATH, attach_snapshot
+
+# =========================
+# Background Ingestion
+# =========================
+# Polls the leads sheet on an interval and publishes each result to the shared
+# LeadStore, so page renders only ever read an already-built snapshot and never
+# wait on a Google API round-trip. Runs inside the Streamlit process by default
+# (LABX_INGEST=background); LABX_INGEST=inline restores fetch-on-expiry.
+#
+# As a separate process it keeps the Parquet snapshot current instead:
+#
+#     python ingest_worker.py --interval 60
+
+INGEST_MODE = os.getenv("LABX_INGEST", "background")
+INGEST_INTERVAL_SECONDS = float(os.getenv("LABX_INGEST_INTERVAL", "60"))
+
+logger = logging.getLogger(__name__)
+
+
+class IngestWorker:
+    """Scheduled `store.refresh()` with health/staleness bookkeeping."""
+
+    def __init__(self, store, interval=INGEST_INTERVAL_SECONDS, scheduler=None):
+        self.store = store
+        self.interval = interval
+        self.last_attempt_at = None
+        self.last_success_at = None
+        self.last_error = None
+        self.runs = 0
+        self.failures = 0
+        self._scheduler = scheduler or BackgroundScheduler(daemon=True)
+
+    def start(self):
+        self._scheduler.add_job(
+            self.run_once, "interval", seconds=self.interval,
+            id="ingest-leads", max_instances=1, coalesce=True,
+            next_run_time=datetime.now(),
+        )
+        self._scheduler.start()
+        return self
+
+    def stop(self):
+        self._scheduler.shutdown(wait=False)
+
+    def run_once(self):
+        self.last_attempt_at = time.time()
+        self.runs += 1
+        try:
+            self.store.refresh()
+        except Exception as e:
+            error = e
+        else:
+            # The store keeps serving the previous snapshot when a refresh fails
+            error = self.store.last_error
+        if error is not None:
+            self.failures += 1
+            self.last_error = error
+            logger.warning("Leads ingestion failed: %s", error)
+        else:
+            self.last_success_at = time.time()
+            self.last_error = None
+
+    def health(self):
+        snapshot = self.store.snapshot
+        age = time.time() - self.last_success_at if self.last_success_at else None
+        return {
+            "last_success_at": self.last_success_at,
+            "last_attempt_at": self.last_attempt_at,
+            "age_seconds": age,
+            "stale": age is None or age > 3 * self.interval,
+            "row_count": snapshot.row_count if snapshot is not None else 0,
+            "version": snapshot.version if snapshot is not None else 0,
+            "runs": self.runs,
+            "failures": self.failures,
+            # Refreshes answered without a fetch because the sheet had not changed
+            "fetches": getattr(self.store.loader, "fetches", None),
+            "skips": getattr(self.store.loader, "skips", None),
+            "last_error": str(self.last_error) if self.last_error is not None else None,
+        }
+
+
+_workers = {}
+_workers_lock = threading.Lock()
+
+
+def get_worker(store):
+    return _workers.get(id(store))
+
+
+def setup_lead_store(store, path=SNAPSHOT_PATH):
+    """`get_store` setup hook: boot from the local snapshot at `path`, then start polling."""
+    attach_snapshot(store, path)
+    if INGEST_MODE != "background":
+        return
+    with _workers_lock:
+        if id(store) not in _workers:
+            _workers[id(store)] = IngestWorker(store).start()
+
+
+def format_age(seconds):
+    if seconds is None:
+        return "never"
+    if seconds < 60:
+        return f"{seconds:.0f}s ago"
+    if seconds < 3600:
+        return f"{seconds / 60:.0f} min ago"
+    return f"{seconds / 3600:.1f} h ago"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Poll the leads sheet and keep the local snapshot current.")
+    parser.add_argument("--interval", type=float, default=INGEST_INTERVAL_SECONDS, help="seconds between polls")
+    parser.add_argument("--path", default=SNAPSHOT_PATH, help=f"snapshot file (default: {SNAPSHOT_PATH})")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    from leads_data import LeadStore
+    from sheets_client import make_leads_loader
+
+    store = LeadStore(make_leads_loader())
+    attach_snapshot(store, args.path)
+    worker = IngestWorker(store, interval=args.interval, scheduler=BlockingScheduler())
+    store.add_listener(lambda snapshot: logger.info("Published %d leads (version %d)", snapshot.row_count, snapshot.version))
+    try:
+        worker.start()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+
+
+if __name__ == "__main__":
+    main()
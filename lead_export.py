@@ -0,0 +1,173 @@
+import os
+import tempfile
+import time
+import uuid
+from urllib.parse import urlencode
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from leads_data import LEAD_SCHEMA
+
+# =========================
+# Streaming Export
+# =========================
+# Filtered leads leave the process as CSV or Parquet without ever building
+# the filtered frame, the whole CSV string or a whole Arrow table: rows are
+# taken from the shared frame a chunk at a time (positions from a LeadView,
+# columns chosen up front) and serialized as they go, so memory stays at one
+# chunk regardless of how many leads match.
+#
+# The dashboard spools an export to a file named by a random token. Small
+# files (up to LABX_EXPORT_INLINE_MB) go through st.download_button, which
+# holds them in memory on every rerun; larger ones are linked to the API
+# server (api.py, at LABX_EXPORT_URL), which streams the file from disk once
+# and deletes it.
+
+EXPORT_CHUNK_ROWS = int(os.getenv("LABX_EXPORT_CHUNK_ROWS", "50000"))
+EXPORT_COLUMNS = list(LEAD_SCHEMA)
+EXPORT_FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+# Spooled dashboard exports older than this are removed on the next export
+SPOOL_MAX_AGE_SECONDS = 3600
+SPOOL_DIR = os.path.join(tempfile.gettempdir(), "labx-exports")
+EXPORT_INLINE_MAX_BYTES = int(float(os.getenv("LABX_EXPORT_INLINE_MB", "16")) * 1024 * 1024)
+EXPORT_URL = os.getenv("LABX_EXPORT_URL", "http://127.0.0.1:8502").rstrip("/")
+
+
+def _column_positions(frame, columns):
+    columns = list(columns) if columns else list(frame.columns)
+    missing = [name for name in columns if name not in frame.columns]
+    if missing:
+        raise ValueError(f"Unknown export column(s): {', '.join(missing)}")
+    return frame.columns.get_indexer(columns)
+
+
+def iter_chunks(frame, positions, columns=None, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Yield the selected rows and columns of `frame` as frames of at most `chunk_rows`."""
+    column_positions = _column_positions(frame, columns)
+    if len(positions) == 0:
+        yield frame.iloc[:0, column_positions]
+        return
+    for start in range(0, len(positions), chunk_rows):
+        # Rows first: a combined iloc[rows, cols] copies the chosen columns in full
+        yield frame.take(positions[start:start + chunk_rows]).iloc[:, column_positions]
+
+
+def iter_csv(frame, positions, columns=None, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Yield UTF-8 CSV bytes for the selected rows, header first."""
+    header = True
+    for chunk in iter_chunks(frame, positions, columns, chunk_rows):
+        yield chunk.to_csv(index=False, header=header).encode()
+        header = False
+
+
+class _ChunkSink:
+    """Write-only file object that hands written bytes back to a generator."""
+
+    def __init__(self):
+        self.parts = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b"".join(self.parts)
+        self.parts.clear()
+        return data
+
+
+def iter_parquet(frame, positions, columns=None, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Yield Parquet bytes for the selected rows, one row group per chunk."""
+    sink = _ChunkSink()
+    writer = None
+    for chunk in iter_chunks(frame, positions, columns, chunk_rows):
+        # Chunks keep the frame's full category list, so every batch has the same schema
+        batch = pa.RecordBatch.from_pandas(chunk, preserve_index=False)
+        if writer is None:
+            writer = pq.ParquetWriter(sink, batch.schema)
+        writer.write_batch(batch)
+        data = sink.drain()
+        if data:
+            yield data
+    writer.close()
+    yield sink.drain()
+
+
+EXPORT_WRITERS = {
+    "CSV": iter_csv,
+    "Parquet": iter_parquet,
+}
+
+
+def spool_export(frame, positions, export_format, columns=None, directory=SPOOL_DIR):
+    """Write an export to a temp file chunk by chunk and return its path.
+
+    The file name holds a random token; see `export_url` and `claim_export`.
+    """
+    os.makedirs(directory, exist_ok=True)
+    cutoff = time.time() - SPOOL_MAX_AGE_SECONDS
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass
+
+    extension, _ = EXPORT_FORMATS[export_format]
+    path = os.path.join(directory, f"leads_{uuid.uuid4().hex}.{extension}")
+    with open(path, "wb") as f:
+        for data in EXPORT_WRITERS[export_format](frame, positions, columns):
+            f.write(data)
+    return path
+
+
+def export_token(path):
+    """The token naming a spooled export."""
+    return os.path.splitext(os.path.basename(path))[0].removeprefix("leads_")
+
+
+def export_url(path, file_name):
+    """One-time download link for a spooled export, served by api.py."""
+    return f"{EXPORT_URL}/api/v1/exports/{export_token(path)}?{urlencode({'name': file_name})}"
+
+
+def claim_export(token, directory=SPOOL_DIR):
+    """Open the spooled export named by `token` and remove it from the spool.
+
+    Returns (file, export format), or None for an unknown or already claimed
+    token. The open file stays readable after removal.
+    """
+    if len(token) != 32 or any(c not in "0123456789abcdef" for c in token):
+        return None
+    for export_format, (extension, _) in EXPORT_FORMATS.items():
+        path = os.path.join(directory, f"leads_{token}.{extension}")
+        try:
+            f = open(path, "rb")
+        except FileNotFoundError:
+            continue
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            f.close()  # claimed by a concurrent request
+            return None
+        except OSError:
+            pass  # left for the age-based cleanup
+        return f, export_format
+    return None
@@ -0,0 +1,344 @@
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# =========================
+# Shared Leads Data Layer
+# =========================
+# Streamlit re-executes dashboard.py on every widget interaction. The leads
+# frame lives here instead, at module level, so every session in the process
+# shares one Sheets pull and one in-memory copy. Sessions hold only their
+# filter state and, when they need rows, a LeadView of positions into it.
+
+DEFAULT_TTL_SECONDS = float(os.getenv("LABX_CACHE_TTL", "300"))
+
+# Days, hours, weeks and months are counted on the business's clock. Naive
+# sheet timestamps are read as LABX_SHEET_TIMEZONE (Google Forms writes the
+# spreadsheet's own zone), which defaults to the business zone.
+BUSINESS_TIMEZONE = os.getenv("LABX_TIMEZONE", "Africa/Nairobi")
+SHEET_TIMEZONE = os.getenv("LABX_SHEET_TIMEZONE", BUSINESS_TIMEZONE)
+
+
+# Only the columns the dashboard reads are kept, in compact dtypes. Free-text
+# sheet columns never reach memory, so the frame's width is fixed.
+LEAD_SCHEMA = {
+    'Timestamp': 'datetime64[ns]',
+    'Score': 'float32',
+    'Vehicle Type': 'category',
+}
+
+
+# Local calendar fields, derived once at ingest so charts and filters never run
+# `.dt` accessors per rerun. Rows without a Timestamp get the MISSING values.
+TIME_COLUMNS = {
+    'Local Day': 'int32',   # days since 1970-01-01
+    'Local Hour': 'int8',   # 0-23
+    'ISO Week': 'int32',    # ISO year * 100 + week, e.g. 202601
+    'Month': 'int32',       # year * 100 + month, e.g. 202512
+}
+MISSING_DAY = np.iinfo(np.int32).min
+MISSING = {'Local Day': MISSING_DAY, 'Local Hour': -1, 'ISO Week': 0, 'Month': 0}
+_NANOS_PER_HOUR = 3_600_000_000_000
+
+
+def local_time(timestamps, timezone=BUSINESS_TIMEZONE, sheet_timezone=SHEET_TIMEZONE):
+    """Naive wall-clock datetime64[ns] values of `timestamps` in `timezone`."""
+    timestamps = pd.Series(timestamps)
+    if timestamps.dt.tz is None:
+        if sheet_timezone == timezone:
+            return timestamps.to_numpy(dtype='datetime64[ns]')
+        # Ambiguous fall-back times read as standard time; skipped spring-forward times move forward
+        timestamps = timestamps.dt.tz_localize(sheet_timezone, ambiguous=False, nonexistent='shift_forward')
+    return timestamps.dt.tz_convert(timezone).dt.tz_localize(None).to_numpy(dtype='datetime64[ns]')
+
+
+def derive_time_columns(timestamps, timezone=BUSINESS_TIMEZONE, sheet_timezone=SHEET_TIMEZONE):
+    """TIME_COLUMNS for `timestamps`, as a dict of compact NumPy arrays."""
+    local = local_time(timestamps, timezone, sheet_timezone)
+    missing = np.isnat(local)
+    days = local.astype('datetime64[D]')
+    day_numbers = days.view(np.int64)
+    hours = (local.view(np.int64) - day_numbers * 24 * _NANOS_PER_HOUR) // _NANOS_PER_HOUR
+    months = local.astype('datetime64[M]').view(np.int64)
+    # ISO weeks belong to the year of their Thursday; 1970-01-01 was a Thursday
+    thursdays = day_numbers - (day_numbers + 3) % 7 + 3
+    iso_years = thursdays.astype('datetime64[D]').astype('datetime64[Y]')
+    weeks = (thursdays - iso_years.astype('datetime64[D]').view(np.int64)) // 7 + 1
+    columns = {
+        'Local Day': day_numbers,
+        'Local Hour': hours,
+        'ISO Week': (iso_years.view(np.int64) + 1970) * 100 + weeks,
+        'Month': (months // 12 + 1970) * 100 + months % 12 + 1,
+    }
+    for name, values in columns.items():
+        values[missing] = MISSING[name]
+        columns[name] = values.astype(TIME_COLUMNS[name])
+    return columns
+
+
+def time_columns(frame):
+    """`frame`'s TIME_COLUMNS: the ingest-time ones, or derived now for frames built elsewhere."""
+    if all(name in frame.columns for name in TIME_COLUMNS):
+        return {name: frame[name].to_numpy() for name in TIME_COLUMNS}
+    return derive_time_columns(frame['Timestamp'])
+
+
+def add_time_columns(frame):
+    """`frame` with TIME_COLUMNS appended (replaced if present)."""
+    return frame.assign(**derive_time_columns(frame['Timestamp']))
+
+
+def normalize_columns(columns):
+    """Build the typed leads frame from raw per-column value lists."""
+    frame = pd.DataFrame({
+        'Timestamp': pd.to_datetime(pd.Series(columns['Timestamp'], dtype=object), format='ISO8601'),
+        'Score': pd.to_numeric(pd.Series(columns['Score'], dtype=object), errors='coerce').astype('float32'),
+        'Vehicle Type': pd.Series(columns['Vehicle Type'], dtype=object).astype('category'),
+    })
+    return add_time_columns(frame)
+
+
+def _require_columns(available):
+    missing = [name for name in LEAD_SCHEMA if name not in available]
+    if missing:
+        raise ValueError(f"Leads sheet is missing column(s): {', '.join(missing)}")
+
+
+def normalize_leads(records):
+    """Build the leads frame from `get_all_records()` output."""
+    if records:
+        _require_columns(records[0])
+    return normalize_columns({name: [record[name] for record in records] for name in LEAD_SCHEMA})
+
+
+def normalize_rows(header, rows):
+    """Build the leads frame from raw sheet rows, reading only the schema columns."""
+    _require_columns(header)
+    positions = {name: header.index(name) for name in LEAD_SCHEMA}
+    return normalize_columns({name: [row[position] for row in rows] for name, position in positions.items()})
+
+
+def append_leads(frame, new_leads):
+    """Concatenate two normalized frames, keeping Vehicle Type categorical.
+
+    Existing category codes are preserved; unseen vehicle types are appended.
+    """
+    old_categories = frame['Vehicle Type'].cat.categories
+    new_categories = new_leads['Vehicle Type'].cat.categories
+    categories = old_categories.append(new_categories.difference(old_categories))
+    if len(categories) != len(old_categories):
+        frame = frame.assign(**{'Vehicle Type': frame['Vehicle Type'].cat.set_categories(categories)})
+    new_leads = new_leads.assign(**{'Vehicle Type': new_leads['Vehicle Type'].cat.set_categories(categories)})
+    return pd.concat([frame, new_leads], ignore_index=True)
+
+
+@dataclass(frozen=True)
+class LeadSnapshot:
+    """One loaded version of the leads frame. Never mutated once published.
+
+    `base_version` is the version whose frame this one extends by appending
+    rows, or None when it may differ anywhere (a full reload, a seed).
+    """
+    frame: pd.DataFrame
+    version: int
+    loaded_at: float
+    base_version: int = None
+
+    @property
+    def row_count(self):
+        return len(self.frame)
+
+    def take(self, positions):
+        """Materialize the rows at `positions` (e.g. from a LeadView)."""
+        return self.frame.take(positions)
+
+
+@dataclass(frozen=True)
+class LeadView:
+    """What a session keeps instead of its own frame: a filter key and row positions.
+
+    `key` starts with the snapshot version the positions refer to.
+    """
+    key: tuple
+    positions: np.ndarray
+
+    @property
+    def version(self):
+        return self.key[0]
+
+    def __len__(self):
+        return len(self.positions)
+
+
+class _Flight:
+    """A fetch in progress that other callers can wait on."""
+
+    def __init__(self):
+        self._done = threading.Event()
+        self.snapshot = None
+        self.error = None
+
+    def finish(self, snapshot=None, error=None):
+        self.snapshot = snapshot
+        self.error = error
+        self._done.set()
+
+    def wait(self):
+        self._done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.snapshot
+
+
+class LeadStore:
+    """TTL-bounded, single-flight cache around a leads loader.
+
+    `loader` is a zero-argument callable returning a normalized frame. It is
+    called by at most one thread at a time; concurrent callers wait for that
+    fetch and share its result. A loader that builds its frame by appending
+    rows to the previous one says so by setting `base_frame` to that frame.
+    """
+
+    def __init__(self, loader, ttl=DEFAULT_TTL_SECONDS):
+        self._loader = loader
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._flight = None
+        self._version = 0
+        self._listeners = []
+        self.last_error = None
+
+    @property
+    def snapshot(self):
+        return self._snapshot
+
+    @property
+    def loader(self):
+        return self._loader
+
+    def add_listener(self, callback):
+        """Call `callback(snapshot)` after each snapshot with new data."""
+        self._listeners.append(callback)
+
+    def seed(self, frame, loaded_at=None):
+        """Publish a frame obtained elsewhere (e.g. a local snapshot) if the store is empty."""
+        with self._lock:
+            if self._snapshot is not None:
+                return self._snapshot
+            self._version += 1
+            self._snapshot = LeadSnapshot(frame=frame, version=self._version, loaded_at=loaded_at or time.time())
+            return self._snapshot
+
+    def is_fresh(self, snapshot=None):
+        snapshot = snapshot if snapshot is not None else self._snapshot
+        if snapshot is None:
+            return False
+        return (time.time() - snapshot.loaded_at) < self.ttl
+
+    def get(self):
+        """Return the cached snapshot, loading it first if missing or expired."""
+        snapshot = self._snapshot
+        if self.is_fresh(snapshot):
+            return snapshot
+        return self._load(force=False)
+
+    def refresh(self):
+        """Force a reload regardless of TTL (joins a fetch already in flight)."""
+        return self._load(force=True)
+
+    def refresh_in_background(self):
+        """Start a forced reload on a daemon thread; errors land in `last_error`."""
+        def run():
+            try:
+                self.refresh()
+            except Exception:
+                pass
+        thread = threading.Thread(target=run, name="lead-store-refresh", daemon=True)
+        thread.start()
+        return thread
+
+    def _load(self, force):
+        with self._lock:
+            if not force and self.is_fresh():
+                return self._snapshot
+            flight = self._flight
+            leader = flight is None
+            if leader:
+                flight = self._flight = _Flight()
+
+        if not leader:
+            return flight.wait()
+
+        try:
+            frame = self._loader()
+        except Exception as e:
+            with self._lock:
+                self._flight = None
+                self.last_error = e
+                stale = self._snapshot
+            if stale is None:
+                flight.finish(error=e)
+                raise
+            # Keep serving the previous data rather than failing every session
+            flight.finish(snapshot=stale)
+            return stale
+
+        with self._lock:
+            previous = self._snapshot
+            # A loader that found nothing new hands back the same frame: keep the
+            # version so caches keyed on it stay valid, just renew the timestamp
+            changed = previous is None or frame is not previous.frame
+            if changed:
+                self._version += 1
+                appended = previous is not None and getattr(self._loader, "base_frame", None) is previous.frame
+                base_version = previous.version if appended else None
+            else:
+                base_version = previous.base_version
+            snapshot = LeadSnapshot(frame=frame, version=self._version, loaded_at=time.time(), base_version=base_version)
+            self._snapshot = snapshot
+            self._flight = None
+            self.last_error = None
+        flight.finish(snapshot=snapshot)
+        if changed:
+            for callback in self._listeners:
+                callback(snapshot)
+        return snapshot
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+# Per-name locks for stores being created, so one store's setup (a snapshot
+# read, a worker start) does not hold up the creation of any other
+_creating = {}
+
+
+def get_store(name, make_loader, ttl=DEFAULT_TTL_SECONDS, setup=None):
+    """Return the process-wide store for `name`, creating it on first use.
+
+    `make_loader()` builds the store's loader and `setup(store)` runs right
+    after creation; neither runs for a store that already exists. Callers
+    asking for a store that is being created wait until its setup is done.
+    """
+    with _stores_lock:
+        store = _stores.get(name)
+        if store is not None:
+            return store
+        creating = _creating.setdefault(name, threading.Lock())
+
+    with creating:
+        with _stores_lock:
+            store = _stores.get(name)
+        if store is None:
+            # A failed setup publishes nothing; the next caller tries again
+            store = LeadStore(make_loader(), ttl=ttl)
+            if setup is not None:
+                setup(store)
+            with _stores_lock:
+                _stores[name] = store
+                _creating.pop(name, None)
+        return store
@@ -0,0 +1,198 @@
+import copy
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import bcrypt
+import yaml
+from limits import parse
+from limits.storage import MemoryStorage
+from limits.strategies import MovingWindowRateLimiter
+
+# =========================
+# Guarded Login
+# =========================
+# bcrypt is deliberately slow (~0.2 s per check). Checking it inline in the
+# script thread lets a burst of logins, or someone hammering the form, take
+# every core away from other sessions' reruns. Checks here run on a small
+# bounded pool (bcrypt releases the GIL, so the waiting script thread costs
+# nothing), excess attempts are turned away instead of queued without limit,
+# and each username and client IP gets an attempt limit plus exponential
+# backoff after repeated failures. The parsed auth config is cached per
+# process and only re-read when config.yaml (or CONFIG_YAML) changes.
+
+CONFIG_PATH = "config.yaml"
+LOGIN_WORKERS = int(os.getenv("LABX_LOGIN_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+LOGIN_QUEUE = int(os.getenv("LABX_LOGIN_QUEUE", "16"))
+LOGIN_TIMEOUT_SECONDS = float(os.getenv("LABX_LOGIN_TIMEOUT", "15"))
+USERNAME_LIMIT = os.getenv("LABX_LOGIN_USER_LIMIT", "10/minute")
+IP_LIMIT = os.getenv("LABX_LOGIN_IP_LIMIT", "30/minute")
+# Failures a username may have before backoff starts, and the cap on the wait
+BACKOFF_AFTER = 3
+BACKOFF_MAX_SECONDS = 300
+
+# Check if running on Render
+is_render = os.getenv("RENDER") == "true"
+
+_config_cache = {}
+_config_lock = threading.Lock()
+
+
+def _parse_config(text, source):
+    try:
+        config = yaml.safe_load(text)
+    except yaml.YAMLError as e:
+        raise ValueError(f"Invalid YAML in {source}: {str(e)}.")
+    if not config:
+        raise ValueError(f"{source} is empty.")
+    return config
+
+
+def auth_config_version(path=CONFIG_PATH):
+    """Changes whenever the auth config does, without reading it: (path, mtime) or the CONFIG_YAML text."""
+    if is_render:
+        config_yaml = os.getenv("CONFIG_YAML")
+        if not config_yaml:
+            raise ValueError("CONFIG_YAML environment variable is missing on Render. Expected YAML content for authentication.")
+        return ("CONFIG_YAML", config_yaml)
+    try:
+        return (path, os.stat(path).st_mtime_ns)
+    except FileNotFoundError:
+        raise ValueError(f"{path} not found in project root. Please create it with credentials, cookie, and preauthorized keys.")
+
+
+def load_auth_config(path=CONFIG_PATH):
+    """Parsed auth config (CONFIG_YAML on Render, else `path`), cached until it changes.
+
+    Returns a deep copy, so each session's Authenticate can mark users logged
+    in without touching the shared parse.
+    """
+    key = auth_config_version(path)
+    with _config_lock:
+        config = _config_cache.get(key)
+        if config is None:
+            if is_render:
+                config = _parse_config(key[1], "CONFIG_YAML")
+            else:
+                try:
+                    with open(path, "r") as f:
+                        config = _parse_config(f.read(), path)
+                except OSError as e:
+                    raise ValueError(f"Error reading {path}: {str(e)}.")
+            _config_cache.clear()
+            _config_cache[key] = config
+    return copy.deepcopy(config)
+
+
+@dataclass(frozen=True)
+class LoginOutcome:
+    """Result of one login attempt: status is ok, invalid, limited or busy."""
+    status: str
+    retry_after: int = 0  # seconds
+
+    @property
+    def ok(self):
+        return self.status == "ok"
+
+
+class LoginGuard:
+    """Rate-limited bcrypt verification on a bounded worker pool."""
+
+    def __init__(self, workers=LOGIN_WORKERS, queue=LOGIN_QUEUE, username_limit=USERNAME_LIMIT,
+                 ip_limit=IP_LIMIT, timeout=LOGIN_TIMEOUT_SECONDS):
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="labx-login")
+        # Running plus waiting checks; beyond this attempts are refused outright
+        self._slots = threading.BoundedSemaphore(workers + queue)
+        self._limiter = MovingWindowRateLimiter(MemoryStorage())
+        self._username_limit = parse(username_limit)
+        self._ip_limit = parse(ip_limit)
+        self._lock = threading.Lock()
+        self._failures = {}  # username -> (consecutive failures, last failure time)
+        self._dummy_hash = None
+        self.checks = 0
+        self.refused = 0
+
+    def _backoff_remaining(self, username):
+        with self._lock:
+            failures, failed_at = self._failures.get(username, (0, 0.0))
+        if failures < BACKOFF_AFTER:
+            return 0
+        wait = min(2 ** (failures - BACKOFF_AFTER), BACKOFF_MAX_SECONDS)
+        return max(0, math.ceil(failed_at + wait - time.time()))
+
+    def _retry_after(self, limit, *identifiers):
+        reset_time = self._limiter.get_window_stats(limit, *identifiers).reset_time
+        return max(1, math.ceil(reset_time - time.time()))
+
+    def _check(self, password, hashed):
+        return bcrypt.checkpw(password.encode(), hashed.encode())
+
+    def verify(self, credentials, username, password, ip_address=None):
+        """Check `password` for `username` against `credentials['usernames']`."""
+        ip_address = ip_address or "unknown"
+        wait = self._backoff_remaining(username)
+        if wait:
+            return LoginOutcome("limited", wait)
+        # Take a slot before charging the limits, so an attempt turned away as
+        # busy uses up none of the user's attempts
+        if not self._slots.acquire(blocking=False):
+            self.refused += 1
+            return LoginOutcome("busy", 1)
+        limited = None
+        if not self._limiter.hit(self._ip_limit, "ip", ip_address):
+            limited = LoginOutcome("limited", self._retry_after(self._ip_limit, "ip", ip_address))
+        elif not self._limiter.hit(self._username_limit, "user", username):
+            limited = LoginOutcome("limited", self._retry_after(self._username_limit, "user", username))
+        if limited is not None:
+            self._slots.release()
+            return limited
+
+        user = credentials.get("usernames", {}).get(username)
+        hashed = user.get("password") if user else None
+        try:
+            if not hashed:
+                # Spend the same bcrypt time on unknown users so timing does not reveal them
+                if self._dummy_hash is None:
+                    self._dummy_hash = bcrypt.hashpw(b"labx", bcrypt.gensalt()).decode()
+                hashed = self._dummy_hash
+            future = self._executor.submit(self._check, password, hashed)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        self.checks += 1
+        try:
+            matched = future.result(timeout=self.timeout) and user is not None
+        except ValueError:
+            # Not a bcrypt hash (e.g. a plain-text password left in config.yaml)
+            matched = False
+        except TimeoutError:
+            return LoginOutcome("busy", 1)
+
+        if matched:
+            with self._lock:
+                self._failures.pop(username, None)
+            return LoginOutcome("ok")
+        if user is not None:
+            # Only configured usernames are tracked, so random names cannot grow this
+            with self._lock:
+                failures, _ = self._failures.get(username, (0, 0.0))
+                self._failures[username] = (failures + 1, time.time())
+        return LoginOutcome("invalid")
+
+
+_guard = None
+_guard_lock = threading.Lock()
+
+
+def get_login_guard():
+    """Process-wide LoginGuard shared by every session."""
+    global _guard
+    with _guard_lock:
+        if _guard is None:
+            _guard = LoginGuard()
+        return _guard
@@ -0,0 +1,77 @@
+import gc
+import threading
+
+from filter_engine import cached_filter_index
+from results_cache import estimate_bytes, get_results_cache
+from rollup import get_cube
+
+# =========================
+# Memory Report
+# =========================
+# Splits the dashboard's footprint into what every session shares (the leads
+# frame and everything derived from it once per snapshot) and what each
+# session adds on top (its session_state: widget values, auth, LeadView).
+
+_heap_frozen = False
+_heap_lock = threading.Lock()
+
+
+def shared_bytes(store):
+    snapshot = store.snapshot
+    index = cached_filter_index(store)
+    return {
+        "leads frame": int(snapshot.frame.memory_usage(deep=True).sum()) if snapshot is not None else 0,
+        "rollup cube": get_cube(store).nbytes,
+        "filter index": index.nbytes if index is not None else 0,
+        "results cache": get_results_cache(store).bytes,
+    }
+
+
+def session_bytes(session_state):
+    return {str(key): estimate_bytes(value) for key, value in session_state.items()}
+
+
+def active_sessions():
+    """Number of connected Streamlit sessions, or None outside a running server."""
+    from streamlit import runtime
+
+    if not runtime.exists():
+        return None
+    try:
+        return len(runtime.get_instance()._session_mgr.list_active_sessions())
+    except AttributeError:
+        # Private Streamlit API; degrade quietly if it moves
+        return None
+
+
+def memory_report(store, session_state):
+    shared = shared_bytes(store)
+    session = session_bytes(session_state)
+    sessions = active_sessions()
+    per_session = sum(session.values())
+    return {
+        "shared": shared,
+        "shared_total": sum(shared.values()),
+        "session": session,
+        "per_session_total": per_session,
+        "active_sessions": sessions,
+        # Estimate: assumes other sessions hold about as much as this one
+        "estimated_total": sum(shared.values()) + per_session * (sessions or 1),
+    }
+
+
+def freeze_import_heap():
+    """Exempt everything allocated so far from cyclic GC, once per process.
+
+    Streamlit runs a full gc.collect() after every script and fragment run
+    (runner.postScriptGC). With pandas, Plotly and pyarrow imported, walking
+    their module objects alone takes ~90 ms per rerun on one core. Called right
+    after those imports, so leads frames, caches and sessions created later are
+    still collected as usual.
+    """
+    global _heap_frozen
+    with _heap_lock:
+        if not _heap_frozen:
+            gc.collect()
+            gc.freeze()
+            _heap_frozen = True
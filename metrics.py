@@ -0,0 +1,198 @@
+import bisect
+import logging
+import os
+import resource
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# =========================
+# Pipeline Metrics
+# =========================
+# Per-stage timers and row counts (auth, Sheets fetch, parsing, rollup,
+# queries, chart build/render, whole reruns), cache hit/miss
+# counters and process RSS, kept per process. The admin sidebar shows recent
+# percentiles; Prometheus scrapes the same numbers as histograms/counters from
+# a small local endpoint (LABX_METRICS_PORT, 0 disables):
+#
+#     curl http://127.0.0.1:9464/metrics
+#
+# Standard library only, so any module can record into it cheaply.
+
+METRICS_HOST = os.getenv("LABX_METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("LABX_METRICS_PORT", "9464"))
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Recent observations per stage kept for the sidebar percentiles
+RECENT_SAMPLES = 512
+
+logger = logging.getLogger(__name__)
+
+
+def rss_bytes():
+    """Current resident set size (Linux), else the peak RSS getrusage reports."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        # ru_maxrss is KB on Linux, bytes on macOS; either way only a fallback
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class StageStats:
+    """Histogram, row counter and recent samples for one pipeline stage."""
+
+    def __init__(self):
+        self.bucket_counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+        self.rows = 0
+        self.last = None
+        self.recent = deque(maxlen=RECENT_SAMPLES)
+
+    def observe(self, seconds, rows=None):
+        index = bisect.bisect_left(BUCKETS, seconds)
+        if index < len(BUCKETS):
+            self.bucket_counts[index] += 1
+        self.count += 1
+        self.sum += seconds
+        self.last = seconds
+        self.recent.append(seconds)
+        if rows is not None:
+            self.rows += int(rows)
+
+
+class Metrics:
+    """Process-wide registry of stage timings and cache statistics."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages = {}
+        self._caches = {}
+
+    def observe(self, stage, seconds, rows=None):
+        with self._lock:
+            stats = self._stages.get(stage)
+            if stats is None:
+                stats = self._stages[stage] = StageStats()
+            stats.observe(seconds, rows)
+
+    @contextmanager
+    def timer(self, stage, rows=None):
+        """Time the block as `stage`; set `timing["rows"]` inside to record a row count."""
+        timing = {"rows": rows}
+        started = time.perf_counter()
+        try:
+            yield timing
+        finally:
+            self.observe(stage, time.perf_counter() - started, timing["rows"])
+
+    def register_cache(self, name, cache):
+        """Export `cache.stats()` (a ResultsCache or anything shaped like it) as `name`."""
+        self._caches[name] = cache
+
+    def stage_summary(self):
+        with self._lock:
+            stages = {stage: (stats.count, stats.rows, stats.last, list(stats.recent)) for stage, stats in self._stages.items()}
+        return [{
+            "stage": stage,
+            "count": count,
+            "rows": rows,
+            "last": last,
+            "p50": percentile(recent, 0.50),
+            "p99": percentile(recent, 0.99),
+        } for stage, (count, rows, last, recent) in stages.items()]
+
+    def cache_summary(self):
+        return {name: cache.stats() for name, cache in list(self._caches.items())}
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format."""
+        lines = [
+            "# HELP labx_stage_seconds Time spent in each dashboard pipeline stage.",
+            "# TYPE labx_stage_seconds histogram",
+        ]
+        with self._lock:
+            stages = sorted(self._stages.items())
+            for stage, stats in stages:
+                cumulative = 0
+                for bound, count in zip(BUCKETS, stats.bucket_counts):
+                    cumulative += count
+                    lines.append(f'labx_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                lines.append(f'labx_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {stats.count}')
+                lines.append(f'labx_stage_seconds_sum{{stage="{stage}"}} {stats.sum}')
+                lines.append(f'labx_stage_seconds_count{{stage="{stage}"}} {stats.count}')
+            lines += [
+                "# HELP labx_stage_rows_total Rows processed by each pipeline stage.",
+                "# TYPE labx_stage_rows_total counter",
+            ]
+            lines += [f'labx_stage_rows_total{{stage="{stage}"}} {stats.rows}' for stage, stats in stages]
+
+        caches = sorted(self.cache_summary().items())
+        for field, kind, help_text in [
+            ("hits", "counter", "Cache lookups served from the cache."),
+            ("misses", "counter", "Cache lookups that had to compute."),
+            ("evictions", "counter", "Entries evicted to stay within limits."),
+            ("entries", "gauge", "Entries currently cached."),
+            ("bytes", "gauge", "Estimated bytes currently cached."),
+        ]:
+            name = f"labx_cache_{field}_total" if kind == "counter" else f"labx_cache_{field}"
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+            lines += [f'{name}{{cache="{cache}"}} {stats[field]}' for cache, stats in caches]
+
+        lines += [
+            "# HELP process_resident_memory_bytes Resident memory size in bytes.",
+            "# TYPE process_resident_memory_bytes gauge",
+            f"process_resident_memory_bytes {rss_bytes()}",
+        ]
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+stage_timer = metrics.timer
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = metrics.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server = None
+_server_attempted = False
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(host=METRICS_HOST, port=METRICS_PORT):
+    """Serve /metrics on a daemon thread; only the first call per process does anything."""
+    global _server, _server_attempted
+    with _server_lock:
+        if _server_attempted or not port:
+            return _server
+        _server_attempted = True
+        try:
+            _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        except OSError as e:
+            # e.g. a second dashboard process on the same host
+            logger.warning("Metrics endpoint not started on %s:%s: %s", host, port, e)
+            return None
+        threading.Thread(target=_server.serve_forever, name="labx-metrics", daemon=True).start()
+        return _server
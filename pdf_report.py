@@ -0,0 +1,217 @@
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import matplotlib
+matplotlib.use("Agg")
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from fpdf import FPDF
+
+from results_cache import ResultsCache
+
+# =========================
+# PDF Report
+# =========================
+# A printable report of the current KPIs and the four dashboard charts for one
+# filter state. Reports are built on a small worker pool so the requesting
+# session keeps rerunning, identical filter states share one build, and the
+# finished bytes are cached per data version for every later download.
+# Charts are drawn with matplotlib (Agg, no pyplot state, so safe per thread);
+# Plotly's static export would need kaleido and a browser.
+
+REPORT_WORKERS = int(os.getenv("LABX_REPORT_WORKERS", "2"))
+REPORT_CACHE_ENTRIES = int(os.getenv("LABX_REPORT_CACHE_ENTRIES", "32"))
+
+# Brand colours from the dashboard CSS; the page is white, not the dark app
+REPORT_PALETTE = ["#4B0082", "#1E90FF", "#808080", "#A9A9A9"]
+CHART_TITLES = {
+    'hourly': "Hourly Leads",
+    'daily': "Leads Over Time",
+    'scores': "Lead Scores Distribution",
+    'vehicles': "Vehicle Type Breakdown",
+}
+
+
+def _label_bars(ax, bars, values):
+    for bar, value in zip(bars, values):
+        ax.annotate(f"{value:g}", (bar.get_x() + bar.get_width() / 2, bar.get_height()),
+                    ha="center", va="bottom", fontsize=8)
+
+
+def render_chart(chart, frame, path):
+    """Draw one dashboard chart from its chart frame to a JPEG at `path`."""
+    fig = Figure(figsize=(9, 4), dpi=110)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    if chart == 'hourly':
+        ax.plot(frame['Hour'], frame['Smoothed Count'], marker="o", color=REPORT_PALETTE[0])
+        ax.set_xticks(range(24), [f"{h}:00" for h in range(24)], rotation=45, fontsize=7)
+        ax.set_xlabel("Hour")
+        ax.set_ylabel("Smoothed Count")
+    elif chart == 'daily':
+        # Markers only while individual days are still distinguishable
+        marker = "o" if len(frame) <= 90 else None
+        ax.plot(frame['Timestamp'], frame['Leads'], marker=marker, markersize=3, color=REPORT_PALETTE[0])
+        ax.set_ylabel("Leads")
+        fig.autofmt_xdate()
+    elif chart == 'scores':
+        scores = frame['Score'].astype(float)
+        gaps = scores.diff().dropna()
+        bars = ax.bar(scores, frame['Count'], width=0.8 * gaps.min() if len(gaps) else 0.4, color=REPORT_PALETTE[1])
+        _label_bars(ax, bars, frame['Count'])
+        ax.set_xlabel("Score")
+        ax.set_ylabel("Count")
+    elif chart == 'vehicles':
+        labels = frame['Vehicle Type'].astype(str)
+        colors = [REPORT_PALETTE[i % len(REPORT_PALETTE)] for i in range(len(frame))]
+        bars = ax.bar(labels, frame['Count'], color=colors)
+        _label_bars(ax, bars, frame['Count'])
+        ax.set_ylabel("Count")
+    else:
+        raise ValueError(f"Unknown chart '{chart}'.")
+    ax.grid(True, alpha=0.3)
+    ax.spines[['top', 'right']].set_visible(False)
+    fig.tight_layout()
+    # JPEG: fpdf 1.7 embeds it as-is, while an RGBA PNG is split in pure Python
+    fig.savefig(path, format="jpg", pil_kwargs={"quality": 90})
+
+
+def describe_filters(start_date, end_date, min_score, max_score, vehicle_types):
+    vehicles = ", ".join(str(vehicle) for vehicle in vehicle_types) or "none"
+    return [
+        ("Date Range", f"{start_date} to {end_date}"),
+        ("Score Range", f"{min_score:.1f} to {max_score:.1f}"),
+        ("Vehicle Types", vehicles),
+    ]
+
+
+def build_report(kpis, frames, filters, generated_at=None):
+    """PDF bytes for one filter state.
+
+    `kpis` is (total leads, completion rate, avg score, high-quality rate),
+    `frames` the dict from `rollup.chart_frames` and `filters` the
+    `describe_filters` arguments.
+    """
+    total_leads, completion_rate, avg_score, high_quality = kpis
+    generated_at = generated_at or datetime.now()
+
+    pdf = FPDF(orientation="P", unit="mm", format="A4")
+    pdf.set_auto_page_break(True, margin=15)
+    pdf.add_page()
+    pdf.set_font("Arial", "B", 18)
+    pdf.cell(0, 10, "LabX Leads Report", ln=1)
+    pdf.set_font("Arial", "", 10)
+    pdf.cell(0, 6, f"Generated {generated_at:%Y-%m-%d %H:%M}", ln=1)
+    pdf.ln(2)
+    for label, value in describe_filters(*filters):
+        pdf.set_font("Arial", "B", 10)
+        pdf.cell(35, 6, label)
+        pdf.set_font("Arial", "", 10)
+        # Core PDF fonts are Latin-1 only
+        pdf.multi_cell(0, 6, value.encode("latin-1", "replace").decode("latin-1"))
+    pdf.ln(4)
+
+    for label, value in [
+        ("Total Leads", f"{total_leads}"),
+        ("Completion Rate", f"{completion_rate:.1f}%"),
+        ("Avg. Lead Score", f"{avg_score:.1f}/5"),
+        ("High-Quality Leads", f"{high_quality:.1f}%"),
+    ]:
+        pdf.set_font("Arial", "", 11)
+        pdf.cell(60, 8, label, border=1)
+        pdf.set_font("Arial", "B", 11)
+        pdf.cell(40, 8, value, border=1, ln=1)
+    pdf.ln(4)
+
+    # fpdf 1.7 only embeds images from files
+    with tempfile.TemporaryDirectory(prefix="labx-report-") as tmp:
+        for chart, title in CHART_TITLES.items():
+            path = os.path.join(tmp, f"{chart}.jpg")
+            render_chart(chart, frames[chart], path)
+            if pdf.get_y() + 90 > pdf.h - 15:
+                pdf.add_page()
+            pdf.set_font("Arial", "B", 12)
+            pdf.cell(0, 8, title, ln=1)
+            pdf.image(path, x=10, w=190, h=84)
+            pdf.ln(2)
+    return pdf.output(dest="S").encode("latin-1")
+
+
+class ReportQueue:
+    """Deduplicated background report builds with cached results.
+
+    A build that raises keeps its exception under its key (see `error`)
+    until the report is requested again.
+    """
+
+    def __init__(self, workers=REPORT_WORKERS, max_entries=REPORT_CACHE_ENTRIES):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="labx-report")
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._errors = {}
+        self._max_errors = max_entries
+        self.reports = ResultsCache(max_entries=max_entries)
+        self.builds = 0
+        self.last_build_seconds = None
+
+    def _build(self, key, build):
+        def timed():
+            started = time.perf_counter()
+            data = build()
+            self.builds += 1
+            self.last_build_seconds = time.perf_counter() - started
+            return data
+        return self.reports.get_or_compute(key, timed)
+
+    def get(self, key):
+        """The finished report for `key`, or None."""
+        return self.reports.get(key)
+
+    def is_pending(self, key):
+        return key in self._pending
+
+    def error(self, key):
+        """The exception the last build for `key` raised, or None."""
+        return self._errors.get(key)
+
+    def request(self, key, build):
+        """Future for the report under `key` (a `results_cache.filter_key`).
+
+        Joins an in-flight build for the same key instead of starting another.
+        """
+        with self._lock:
+            future = self._pending.get(key)
+            if future is not None:
+                return future
+            self._errors.pop(key, None)
+            future = self._pending[key] = self._executor.submit(self._build, key, build)
+        # Outside the lock: a build that already finished runs the callback here
+        future.add_done_callback(lambda done: self._forget(key, done))
+        return future
+
+    def _forget(self, key, future):
+        error = future.exception()
+        with self._lock:
+            if error is not None:
+                self._errors[key] = error
+                # Oldest first; keep as many as there are cached reports
+                while len(self._errors) > self._max_errors:
+                    del self._errors[next(iter(self._errors))]
+            self._pending.pop(key, None)
+
+
+_queues = {}
+_queues_lock = threading.Lock()
+
+
+def get_report_queue(store):
+    """Process-wide ReportQueue for `store`."""
+    with _queues_lock:
+        queue = _queues.get(id(store))
+        if queue is None:
+            queue = _queues[id(store)] = ReportQueue()
+        return queue
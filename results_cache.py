@@ -0,0 +1,134 @@
+import dataclasses
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# =========================
+# Per-Filter-State Results Cache
+# =========================
+# Analysts flip between a handful of filter combinations. The KPIs and chart
+# frames for each (snapshot version, filters) pair are kept here, LRU-evicted
+# by entry count and approximate memory, and dropped whenever a new snapshot
+# is published.
+
+MAX_ENTRIES = int(os.getenv("LABX_RESULTS_CACHE_ENTRIES", "128"))
+MAX_BYTES = int(os.getenv("LABX_RESULTS_CACHE_MB", "64")) * 1024 * 1024
+
+
+def filter_key(version, start_date, end_date, min_score, max_score, vehicle_types):
+    # Vehicle selection order is irrelevant; key=str keeps NaN sortable
+    return (version, start_date, end_date, float(min_score), float(max_score),
+            tuple(sorted(vehicle_types, key=str)))
+
+
+def estimate_bytes(value):
+    """Rough deep size of a cached value (frames, arrays, containers, dataclasses, scalars)."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True, index=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True, index=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_bytes(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_bytes(item) for item in value)
+    if dataclasses.is_dataclass(value):
+        return sys.getsizeof(value) + sum(estimate_bytes(getattr(value, field.name)) for field in dataclasses.fields(value))
+    return sys.getsizeof(value)
+
+
+class ResultsCache:
+    """Thread-safe LRU bounded by entry count and estimated bytes.
+
+    With `versioned=True` the first key element is the data version and a new
+    version empties the cache; otherwise keys are opaque.
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES, versioned=True):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.versioned = versioned
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._version = None
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def invalidate(self, version=None):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+            self._version = version
+
+    def get(self, key):
+        """The cached value for `key`, or None; never computes."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for `key`, computing and storing it on a miss."""
+        with self._lock:
+            if self.versioned and key[0] != self._version:
+                self._entries.clear()
+                self.bytes = 0
+                self._version = key[0]
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        value = compute()
+        size = estimate_bytes(value)
+        with self._lock:
+            if (self.versioned and key[0] != self._version) or size > self.max_bytes:
+                return value
+            if key not in self._entries:
+                self._entries[key] = (value, size)
+                self.bytes += size
+            while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+        return value
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_results_cache(store):
+    """Process-wide results cache for `store`, emptied on each new snapshot."""
+    with _caches_lock:
+        cache = _caches.get(id(store))
+        if cache is None:
+            cache = _caches[id(store)] = ResultsCache()
+            store.add_listener(lambda snapshot: cache.invalidate(snapshot.version))
+        return cache
@@ -0,0 +1,420 @@
+import os
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from filter_engine import LeadIndex, day_ordinal, get_filter_index
+from leads_data import MISSING_DAY, time_columns
+from metrics import stage_timer
+
+# =========================
+# Prefix-Sum Time Index
+# =========================
+# Lead counts per (local day, hour of day, vehicle type, exact score value),
+# stored as running totals over days: prefix[d] holds every lead before day d.
+# A date range is then prefix[end + 1] - prefix[start] (no rows rescanned),
+# score sums are count x score value, and the score/vehicle filters are a
+# boolean mask over the small (vehicle, score) plane. Daily series, moving
+# averages and week-over-week deltas come from differences of the same
+# entries. Appended leads update the tail in place.
+#
+# Leads without a Timestamp or Score never match the dashboard filters and are
+# not indexed.
+#
+# The index is dense: (days + 1) x 24 x vehicle types x distinct scores
+# cells, so fractional scores or many vehicle types can grow it far past the
+# frame. Past LABX_CUBE_MAX_MB it is not built; the same queries are then
+# answered by scanning the matching rows of the snapshot's LeadIndex.
+
+HOURS = 24
+HIGH_QUALITY_SCORE = 3
+TREND_WINDOWS = (7, 28)
+# Where KPIs and chart series come from: "cube" (this index) or "scan" (one
+# pass over the LeadIndex rows, see scan_summary)
+SUMMARY_SOURCE = os.getenv("LABX_SUMMARY_SOURCE", "cube")
+CUBE_MAX_BYTES = int(float(os.getenv("LABX_CUBE_MAX_MB", "64")) * 1024 * 1024)
+
+
+def _day_values(ordinals):
+    return pd.DatetimeIndex(np.asarray(ordinals, dtype=np.int64).astype('datetime64[D]').astype('datetime64[ns]'))
+
+
+def _vehicle_series(counts, vehicles):
+    """Nonzero counts per vehicle: by name (a missing one last), then largest first."""
+    series = pd.Series(counts, index=vehicles)[counts > 0]
+    series = series.iloc[np.argsort(series.index.astype(str), kind='stable')]
+    series = series.iloc[np.argsort(series.index.isna(), kind='stable')]
+    return series.sort_values(ascending=False, kind='stable')
+
+
+@dataclass(frozen=True)
+class CubeResult:
+    """KPIs and chart series for one filter state."""
+    total_leads: int
+    scored_leads: int
+    score_sum: float
+    high_quality_leads: int
+    hourly: pd.Series       # 24 counts indexed by hour
+    daily: pd.Series        # scored leads per day, contiguous days
+    scores: pd.Series       # lead count per score value
+    vehicles: pd.Series     # lead count per vehicle type, largest first
+
+    @property
+    def completion_rate(self):
+        return self.scored_leads / self.total_leads * 100 if self.total_leads > 0 else 0
+
+    @property
+    def avg_score(self):
+        return self.score_sum / self.scored_leads if self.scored_leads > 0 else float('nan')
+
+    @property
+    def high_quality_rate(self):
+        return self.high_quality_leads / self.total_leads * 100 if self.total_leads > 0 else 0
+
+
+def chart_frames(result):
+    """The four chart-ready frames dashboard.py plots for a CubeResult."""
+    hourly_counts = result.hourly.rename_axis('Hour').reset_index(name='Count')
+    hourly_counts['Hour'] = hourly_counts['Hour'].astype(int)
+    # Apply 3-hour rolling average for smoothing
+    hourly_counts['Smoothed Count'] = hourly_counts['Count'].rolling(window=3, center=True, min_periods=1).mean()
+
+    leads_over_time = result.daily.rename_axis('Timestamp').reset_index()
+    leads_over_time.columns = ['Timestamp', 'Leads']
+
+    score_counts = result.scores.reset_index()
+    score_counts.columns = ['Score', 'Count']
+
+    vehicle_counts = result.vehicles.reset_index()
+    vehicle_counts.columns = ["Vehicle Type", "Count"]
+    return {
+        'hourly': hourly_counts,
+        'daily': leads_over_time,
+        'scores': score_counts,
+        'vehicles': vehicle_counts,
+    }
+
+
+def scan_summary(index, start_date, end_date, min_score, max_score, vehicle_types):
+    """CubeResult for one filter state from a single pass over a LeadIndex's matching rows.
+
+    Every KPI and chart series comes from two bincounts over precomputed codes:
+    one over (hour, vehicle, score) cells and one over days (already sorted).
+    """
+    window = index.date_slice(start_date, end_date)
+    # Gathering matched positions once beats compressing each array by the mask
+    matched = np.flatnonzero(index.match(window, min_score, max_score, vehicle_types)) + window.start
+    vehicle_slots = len(index.vehicle_categories) + 1
+    score_slots = len(index.score_values)
+    cells = (index.hours[matched].astype(np.int32) * vehicle_slots
+             + index.vehicle_codes[matched]) * score_slots + index.score_codes[matched]
+    counts = np.bincount(cells, minlength=HOURS * vehicle_slots * score_slots)
+    counts = counts.reshape(HOURS, vehicle_slots, score_slots)
+
+    days = index.days[matched]
+    if len(days):
+        daily = pd.Series(np.bincount(days - days[0]), index=_day_values(np.arange(days[0], days[-1] + 1)))
+    else:
+        daily = pd.Series([], index=pd.DatetimeIndex([]), dtype=np.int64)
+
+    score_values = index.score_values.astype(np.float32)
+    score_counts = counts.sum(axis=(0, 1))
+    # The NaN score slot never matches, so leave it out of the sum
+    scored = score_counts > 0
+    total = int(score_counts.sum())
+    return CubeResult(
+        total_leads=total,
+        scored_leads=total,
+        score_sum=float((score_counts[scored] * score_values[scored].astype(np.float64)).sum()),
+        high_quality_leads=int(score_counts[score_values > HIGH_QUALITY_SCORE].sum()),
+        hourly=pd.Series(counts.sum(axis=(1, 2)), index=pd.RangeIndex(HOURS, name='Hour')),
+        daily=daily,
+        scores=pd.Series(score_counts, index=pd.Index(score_values, name='Score'))[scored],
+        vehicles=_vehicle_series(counts.sum(axis=(0, 2)), pd.Index([np.nan]).append(index.vehicle_categories)),
+    )
+
+
+def query_summary(cube, start_date, end_date, min_score, max_score, vehicle_types, index=None):
+    """(KPIs, chart frames) for one filter state, as cached per filter key by the dashboard and API.
+
+    With a LeadIndex as `index` the rows are scanned instead of the cube queried.
+    """
+    filters = (start_date, end_date, min_score, max_score, vehicle_types)
+    with stage_timer("query") as timing:
+        result = scan_summary(index, *filters) if index is not None else cube.query(*filters)
+        timing["rows"] = result.total_leads
+    kpis = (result.total_leads, result.completion_rate, result.avg_score, result.high_quality_rate)
+    return kpis, chart_frames(result)
+
+
+@dataclass(frozen=True)
+class TrendResult:
+    """Trailing-window trend KPIs ending on a filter state's end date."""
+    last_7: int             # leads in the 7 days ending on end_date
+    previous_7: int         # leads in the 7 days before those
+    avg_7: float            # leads per day over the last 7 days
+    avg_28: float           # leads per day over the last 28 days
+
+    @property
+    def week_over_week(self):
+        """Percentage change of last_7 over previous_7, or None without a previous week."""
+        return (self.last_7 - self.previous_7) / self.previous_7 * 100 if self.previous_7 > 0 else None
+
+
+class RollupCube:
+    """Prefix-sum index kept in step with a LeadStore's snapshots.
+
+    A snapshot that appends to the cube's version (its `base_version`) adds
+    the new leads to the running totals from their first day on; anything
+    else (a full reload, a lead dated before the first day, a new vehicle
+    type or score value) rebuilds it. Past CUBE_MAX_BYTES the prefix sums
+    are dropped and queries scan `index`, from `index_for(snapshot)` (default:
+    a LeadIndex of its own).
+    """
+
+    def __init__(self, index_for=None):
+        self._index_for = index_for
+        self.index = None
+        self._lock = threading.Lock()
+        self.version = None
+        self.vehicle_types = []
+        self._vehicles = pd.Index([])           # vehicle axis; slot 0 is a missing vehicle
+        self._scores = np.array([], dtype=np.float32)   # score axis, sorted
+        self._start = 0                         # day ordinal of prefix row 0
+        self.prefix = np.zeros((1, HOURS, 1, 0), dtype=np.int64)
+        self.day_prefix = self.prefix.sum(axis=1)
+        self._day_range = None
+        self._rows = 0
+
+    @property
+    def nbytes(self):
+        return self.prefix.nbytes + self.day_prefix.nbytes
+
+    @property
+    def days(self):
+        return self._day_range[1] - self._start + 1 if self._day_range else 0
+
+    def _prefix_bytes(self, days):
+        """Bytes of `prefix` plus `day_prefix` over `days` days."""
+        return (days + 1) * (HOURS + 1) * len(self._vehicles) * len(self._scores) * np.dtype(np.int64).itemsize
+
+    def update(self, snapshot):
+        with self._lock:
+            # Never step back to an older snapshot a slow session still holds
+            if self.version is not None and snapshot.version <= self.version:
+                return self
+            frame = snapshot.frame
+            with stage_timer("rollup") as timing:
+                if self.version is not None and snapshot.base_version == self.version and self.index is None:
+                    added = frame.iloc[self._rows:]
+                    if len(added) and not self._append(added):
+                        self._build(snapshot)
+                else:
+                    added = frame
+                    self.vehicle_types = []
+                    self._build(snapshot)
+                timing["rows"] = len(added)
+            for vehicle in added['Vehicle Type'].unique() if len(added) else []:
+                if vehicle not in self.vehicle_types:
+                    self.vehicle_types.append(vehicle)
+            self._rows = len(frame)
+            self.version = snapshot.version
+            return self
+
+    @staticmethod
+    def _columns(frame):
+        times = time_columns(frame)
+        days, hours = times['Local Day'], times['Local Hour']
+        scores = frame['Score'].to_numpy(dtype=np.float32, na_value=np.nan)
+        vehicles = frame['Vehicle Type']
+        return days, hours, scores, vehicles, days != MISSING_DAY
+
+    def _counts(self, days, hours, scores, vehicles, first_day, day_count):
+        """Lead counts shaped (day_count, HOURS, vehicles, scores) from `first_day` on."""
+        keep = (days != MISSING_DAY) & ~np.isnan(scores)
+        if isinstance(vehicles.dtype, pd.CategoricalDtype):
+            # Look up each category once, then map codes (-1, missing, lands on slot 0)
+            slots = np.append(self._vehicles.get_indexer(vehicles.cat.categories), 0)
+            vehicle_slots = slots[vehicles.cat.codes.to_numpy()[keep]]
+        else:
+            vehicle_slots = self._vehicles.get_indexer(vehicles.to_numpy()[keep])
+        vehicle_slots[vehicle_slots < 0] = 0
+        score_slots = np.searchsorted(self._scores, scores[keep])
+        shape = (day_count, HOURS, len(self._vehicles), len(self._scores))
+        cells = np.ravel_multi_index((days[keep].astype(np.int64) - first_day, hours[keep], vehicle_slots, score_slots), shape)
+        return np.bincount(cells, minlength=int(np.prod(shape))).reshape(shape)
+
+    def _build(self, snapshot):
+        frame = snapshot.frame
+        days, hours, scores, vehicles, dated = self._columns(frame)
+        scored = dated & ~np.isnan(scores)
+        self._vehicles = pd.Index([np.nan]).append(pd.Index(pd.unique(vehicles.to_numpy()[scored])).dropna())
+        self._scores = np.unique(scores[scored]).astype(np.float32)
+        self._day_range = (int(days[dated].min()), int(days[dated].max())) if dated.any() else None
+        self._start = self._day_range[0] if self._day_range else 0
+        if self._prefix_bytes(self.days) > CUBE_MAX_BYTES:
+            self.index = self._index_for(snapshot) if self._index_for else LeadIndex(frame)
+            self.prefix = np.zeros((1, HOURS, 0, 0), dtype=np.int64)
+            self.day_prefix = self.prefix.sum(axis=1)
+            return
+        self.index = None
+        counts = self._counts(days, hours, scores, vehicles, self._start, self.days)
+        self.prefix = np.concatenate([np.zeros((1,) + counts.shape[1:], dtype=np.int64), np.cumsum(counts, axis=0)])
+        self.day_prefix = self.prefix.sum(axis=1)
+
+    def _append(self, added):
+        """Add appended leads to the running totals; False when a rebuild is needed instead."""
+        days, hours, scores, vehicles, dated = self._columns(added)
+        scored = dated & ~np.isnan(scores)
+        if not dated.any():
+            return True
+        first_day, last_day = int(days[dated].min()), int(days[dated].max())
+        if self._day_range is None or first_day < self._start:
+            return False
+        if self._prefix_bytes(max(self._day_range[1], last_day) - self._start + 1) > CUBE_MAX_BYTES:
+            return False
+        if not np.isin(scores[scored], self._scores).all():
+            return False
+        new_vehicles = pd.Index(pd.unique(vehicles.to_numpy()[scored])).dropna()
+        if len(new_vehicles.difference(self._vehicles)):
+            return False
+
+        self._day_range = (self._day_range[0], max(self._day_range[1], last_day))
+        day_count = self.days
+        if day_count > len(self.prefix) - 1:
+            # New days start from the running total so far
+            grow = np.repeat(self.prefix[-1:], day_count - len(self.prefix) + 1, axis=0)
+            self.prefix = np.concatenate([self.prefix, grow])
+        offset = first_day - self._start
+        counts = self._counts(days, hours, scores, vehicles, first_day, day_count - offset)
+        self.prefix[offset + 1:] += np.cumsum(counts, axis=0)
+        self.day_prefix = self.prefix.sum(axis=1)
+        return True
+
+    @property
+    def first_day(self):
+        return _day_values([self._day_range[0]])[0].date() if self._day_range else None
+
+    @property
+    def last_day(self):
+        return _day_values([self._day_range[1]])[0].date() if self._day_range else None
+
+    def _rows_for(self, first_day, last_day):
+        """Prefix rows (lo, hi) so that prefix[hi] - prefix[lo] covers day ordinals first_day..last_day."""
+        lo = min(max(first_day - self._start, 0), self.days)
+        hi = min(max(last_day - self._start + 1, 0), self.days)
+        return lo, max(lo, hi)
+
+    def _mask(self, min_score, max_score, vehicle_types):
+        """Boolean (vehicle, score) plane selected by the score range and vehicle filter."""
+        wanted = self._vehicles.get_indexer(pd.Index(list(vehicle_types)))
+        vehicles = np.zeros(len(self._vehicles), dtype=bool)
+        vehicles[wanted[wanted >= 0]] = True
+        scores = (self._scores >= min_score) & (self._scores <= max_score)
+        return vehicles[:, None] & scores[None, :]
+
+    def _daily_prefix(self, mask, lo, hi):
+        """Running lead totals over prefix rows lo..hi for the masked cells."""
+        return self.day_prefix[lo:hi + 1][:, mask].sum(axis=1)
+
+    def _scan(self, first_day, last_day, min_score, max_score, vehicle_types):
+        """Local days and hours of the indexed leads matching the filters on day ordinals first_day..last_day."""
+        window = self.index.day_slice(first_day, last_day)
+        matched = np.flatnonzero(self.index.match(window, min_score, max_score, vehicle_types)) + window.start
+        return self.index.days[matched], self.index.hours[matched]
+
+    def _daily_totals(self, lo, hi, min_score, max_score, vehicle_types):
+        """Running lead totals over prefix rows lo..hi, from the prefix sums or a scan."""
+        if self.index is None:
+            return self._daily_prefix(self._mask(min_score, max_score, vehicle_types), lo, hi)
+        days, _ = self._scan(lo + self._start, hi - 1 + self._start, min_score, max_score, vehicle_types)
+        counts = np.bincount(days.astype(np.int64) - (lo + self._start), minlength=hi - lo)
+        return np.concatenate([[0], np.cumsum(counts)])
+
+    def query(self, start_date, end_date, min_score, max_score, vehicle_types):
+        if self.index is not None:
+            return scan_summary(self.index, start_date, end_date, min_score, max_score, vehicle_types)
+        lo, hi = self._rows_for(day_ordinal(start_date), day_ordinal(end_date))
+        mask = self._mask(min_score, max_score, vehicle_types)
+        cells = np.where(mask, self.day_prefix[hi] - self.day_prefix[lo], 0)
+        by_hour = (self.prefix[hi] - self.prefix[lo])[:, mask].sum(axis=1)
+
+        daily_counts = np.diff(self._daily_prefix(mask, lo, hi))
+        active = np.flatnonzero(daily_counts)
+        if len(active):
+            first, last = active[0], active[-1]
+            daily = pd.Series(daily_counts[first:last + 1], index=_day_values(np.arange(first, last + 1) + lo + self._start))
+        else:
+            daily = pd.Series([], index=pd.DatetimeIndex([]), dtype=np.int64)
+
+        score_counts = cells.sum(axis=0)
+        return CubeResult(
+            total_leads=int(cells.sum()),
+            scored_leads=int(cells.sum()),
+            score_sum=float((score_counts * self._scores.astype(np.float64)).sum()),
+            high_quality_leads=int(score_counts[self._scores > HIGH_QUALITY_SCORE].sum()),
+            hourly=pd.Series(by_hour, index=pd.RangeIndex(HOURS, name='Hour')),
+            daily=daily,
+            scores=pd.Series(score_counts, index=pd.Index(self._scores, name='Score'))[score_counts > 0],
+            vehicles=_vehicle_series(cells.sum(axis=1), self._vehicles),
+        )
+
+    def hourly_series(self, start_date, end_date, min_score, max_score, vehicle_types):
+        """Scored leads per clock hour (contiguous hours), the hourly counterpart of `daily`."""
+        lo, hi = self._rows_for(day_ordinal(start_date), day_ordinal(end_date))
+        if self.index is None:
+            mask = self._mask(min_score, max_score, vehicle_types)
+            counts = np.diff(self.prefix[lo:hi + 1][:, :, mask].sum(axis=2), axis=0).ravel()
+        else:
+            days, hours = self._scan(lo + self._start, hi - 1 + self._start, min_score, max_score, vehicle_types)
+            slots = (days.astype(np.int64) - (lo + self._start)) * HOURS + hours
+            counts = np.bincount(slots, minlength=(hi - lo) * HOURS)
+        active = np.flatnonzero(counts)
+        if not len(active):
+            return pd.Series([], index=pd.DatetimeIndex([]), dtype=np.int64)
+        first, last = active[0], active[-1]
+        hours = _day_values([lo + self._start])[0] + pd.to_timedelta(np.arange(first, last + 1), unit='h')
+        return pd.Series(counts[first:last + 1], index=hours)
+
+    def moving_averages(self, start_date, end_date, min_score, max_score, vehicle_types, windows=TREND_WINDOWS):
+        """Trailing per-day averages over each of `windows` days, for every day in the range."""
+        lo, hi = self._rows_for(day_ordinal(start_date), day_ordinal(end_date))
+        reach = max(windows)
+        # Days before the range feed its first averages; days before the data count as zero
+        before = min(lo, reach)
+        totals = self._daily_totals(lo - before, hi, min_score, max_score, vehicle_types)
+        totals = np.concatenate([np.zeros(reach - before, dtype=np.int64), totals])
+        ends = np.arange(reach + 1, len(totals))
+        return pd.DataFrame(
+            {f"{window}-day avg": (totals[ends] - totals[ends - window]) / window for window in windows},
+            index=_day_values(np.arange(lo, hi) + self._start),
+        )
+
+    def trends(self, start_date, end_date, min_score, max_score, vehicle_types):
+        """TrendResult for the trailing weeks ending on end_date (start_date is not used)."""
+        def total(days_back, days):
+            # Leads in the `days` days ending `days_back` days before end_date
+            last_day = day_ordinal(end_date) - days_back
+            lo, hi = self._rows_for(last_day - days + 1, last_day)
+            totals = self._daily_totals(lo, hi, min_score, max_score, vehicle_types)
+            return int(totals[-1] - totals[0])
+
+        last_7 = total(0, 7)
+        return TrendResult(last_7=last_7, previous_7=total(7, 7), avg_7=last_7 / 7, avg_28=total(0, 28) / 28)
+
+
+_cubes = {}
+_cubes_lock = threading.Lock()
+
+
+def get_cube(store, snapshot=None):
+    """Process-wide cube for `store`, brought up to date with `snapshot` (default: latest)."""
+    with _cubes_lock:
+        cube = _cubes.get(id(store))
+        if cube is None:
+            cube = _cubes[id(store)] = RollupCube(index_for=lambda snapshot: get_filter_index(store, snapshot))
+            store.add_listener(cube.update)
+    snapshot = snapshot if snapshot is not None else store.snapshot
+    return cube.update(snapshot) if snapshot is not None else cube
@@ -0,0 +1,131 @@
+import hashlib
+import json
+import logging
+import os
+import time
+
+from metrics import stage_timer
+
+# =========================
+# Conditional Refresh
+# =========================
+# Most refreshes find the sheet exactly as it was. Before a loader fetches,
+# a cheap change signal is read; when it matches the signal recorded at the
+# last fetch, the previous frame is handed back (so the LeadStore keeps its
+# version) and nothing is downloaded or parsed. LABX_CHANGE_SIGNAL picks it:
+#
+#   drive - the spreadsheet's Drive modifiedTime. One small files.get request,
+#           billed to the Drive quota rather than the Sheets read quota; any
+#           edit anywhere in the file changes it. The default.
+#   tail  - the header plus the last LABX_TAIL_ROWS known rows and the row
+#           below them, hashed. One small Sheets request; catches appends,
+#           deletions and edits near the end, but not edits further up. The
+#           window moves with the row count, so the poll after a change
+#           fetches once more to record it.
+#   off   - always fetch.
+#
+# The signal is read before fetching, so a change landing mid-fetch is seen
+# on the next poll. A fetch still happens at least every LABX_MAX_SKIP_SECONDS,
+# and when a probe fails.
+
+CHANGE_SIGNAL = os.getenv("LABX_CHANGE_SIGNAL", "drive")
+TAIL_ROWS = int(os.getenv("LABX_TAIL_ROWS", "20"))
+MAX_SKIP_SECONDS = float(os.getenv("LABX_MAX_SKIP_SECONDS", "3600"))
+
+logger = logging.getLogger(__name__)
+
+
+def drive_signal(client, rows=None):
+    """The spreadsheet's Drive modifiedTime."""
+    client.worksheet()  # resolves spreadsheet_id on first use
+    return client.gc.get_file_drive_metadata(client.spreadsheet_id)["modifiedTime"]
+
+
+def tail_signal(client, rows, tail_rows=TAIL_ROWS):
+    """Hash of the header and the last `tail_rows` of `rows` known data rows, or
+    None when the row below them is filled (rows were appended)."""
+    if rows is None:
+        return None
+    worksheet = client.worksheet()
+    # Sheet rows: 1 is the header, data rows 2..rows + 1, then the first unknown row
+    first_row = max(rows - tail_rows + 2, 2)
+    last_row = rows + 2
+    header, tail = worksheet.batch_get(["1:1", f"{first_row}:{last_row}"])
+    if len(tail) > last_row - first_row:
+        return None
+    digest = hashlib.blake2b(json.dumps([list(header), list(tail)]).encode(), digest_size=16)
+    return f"{rows}:{digest.hexdigest()}"
+
+
+SIGNALS = {"drive": drive_signal, "tail": tail_signal}
+
+
+class ConditionalLoader:
+    """Leads loader that fetches through `loader` only when `signal` has changed.
+
+    `signal(rows)` returns a JSON-serializable value identifying the sheet's
+    state (`rows` is the length of the last frame, or None), or None when it
+    cannot tell. `skips` counts refreshes answered with the previous frame.
+    """
+
+    def __init__(self, loader, signal, max_skip_seconds=MAX_SKIP_SECONDS):
+        self._loader = loader
+        self._signal = signal
+        self.max_skip_seconds = max_skip_seconds
+        self.frame = None
+        self.signal = None
+        self.fetched_at = None
+        self.fetches = 0
+        self.skips = 0
+        self.probe_errors = 0
+
+    def __call__(self):
+        return self.load()
+
+    @property
+    def base_frame(self):
+        return getattr(self._loader, "base_frame", None)
+
+    def invalidate(self):
+        """Make the next load fetch regardless of the signal (e.g. "Refresh data")."""
+        self.signal = None
+
+    def load(self, force=False):
+        """The leads frame; the previous one unless the signal changed or `force`."""
+        try:
+            with stage_timer("change_probe"):
+                signal = self._signal(len(self.frame) if self.frame is not None else None)
+        except Exception as e:
+            self.probe_errors += 1
+            logger.warning("Sheet change probe failed, fetching anyway: %s", e)
+            signal = None
+
+        recent = self.fetched_at is not None and time.time() - self.fetched_at < self.max_skip_seconds
+        if not force and recent and self.frame is not None and signal is not None and signal == self.signal:
+            self.skips += 1
+            return self.frame
+
+        self.frame = self._loader()
+        self.signal = signal
+        self.fetched_at = time.time()
+        self.fetches += 1
+        return self.frame
+
+    def state(self):
+        """The wrapped loader's sync state plus the signal the frame was fetched at."""
+        sync = self._loader.state() if hasattr(self._loader, "state") else None
+        return {"sync": sync, "change_signal": self.signal, "fetched_at": self.fetched_at}
+
+    def restore(self, frame, state):
+        # Snapshots written before conditional refresh hold the wrapped loader's state directly
+        sync = state.get("sync") if "change_signal" in state else state
+        if sync is not None and hasattr(self._loader, "restore"):
+            self._loader.restore(frame, sync)
+        self.frame = frame
+        self.signal = state.get("change_signal")
+        self.fetched_at = state.get("fetched_at")
+
+    def stats(self):
+        """Shaped like ResultsCache.stats(): hits are skipped refreshes, misses fetches."""
+        return {"hits": self.skips, "misses": self.fetches, "evictions": 0,
+                "entries": int(self.frame is not None), "bytes": 0}
@@ -0,0 +1,159 @@
+import base64
+import json
+import os
+import threading
+from functools import partial
+
+import gspread
+from google.auth.transport.requests import AuthorizedSession
+from google.oauth2.service_account import Credentials
+from requests.adapters import HTTPAdapter
+
+from leads_data import normalize_leads
+from metrics import stage_timer
+from sheet_changes import CHANGE_SIGNAL, SIGNALS, ConditionalLoader
+from sheets_sync import IncrementalSheetLoader
+
+# =========================
+# Google Sheets Access
+# =========================
+# One long-lived client per process: credentials are parsed once, the OAuth
+# access token is reused until google-auth sees it near expiry, requests go
+# through one pooled HTTP session, and the spreadsheet/worksheet are resolved
+# by name only once. Reaching the sheet again costs no network calls. Every
+# spreadsheet (one per tenant, see tenants.py) is reached through the same
+# authorized client and session.
+
+SCOPES = ['https://www.googleapis.com/auth/spreadsheets', 'https://www.googleapis.com/auth/drive']
+SPREADSHEET_NAME = "Microfinance Leads"
+# Optional: skips the by-name Drive lookup on the very first open too
+SPREADSHEET_ID = os.getenv("LABX_SPREADSHEET_ID")
+HTTP_POOL_SIZE = int(os.getenv("LABX_HTTP_POOL_SIZE", "16"))
+
+# Check if running on Render
+is_render = os.getenv("RENDER") == "true"
+
+
+def load_google_creds():
+    # Base64-encoded service account JSON (see test.py for producing it)
+    b64_creds = os.getenv("GOOGLE_CREDENTIALS_B64")
+    if b64_creds:
+        try:
+            return json.loads(base64.b64decode(b64_creds).decode())
+        except (ValueError, UnicodeDecodeError) as e:
+            raise ValueError(f"Invalid GOOGLE_CREDENTIALS_B64: {str(e)}.")
+    # Load Google Sheets credentials (local file or env var)
+    if is_render:
+        google_creds_json = os.getenv("GOOGLE_SHEETS_CREDENTIALS")
+        if not google_creds_json:
+            raise ValueError("GOOGLE_SHEETS_CREDENTIALS environment variable is missing on Render. Expected JSON content for Google Service Account.")
+        try:
+            return json.loads(google_creds_json)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON in GOOGLE_SHEETS_CREDENTIALS: {str(e)}. Check your JSON content in Render environment variables.")
+    try:
+        with open("credentials.json", "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        raise ValueError("credentials.json not found in project root. Please create it with Google Service Account credentials.")
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON in credentials.json: {str(e)}.")
+    except Exception as e:
+        raise ValueError(f"Error reading credentials.json: {str(e)}.")
+
+
+_gc = None
+_gc_lock = threading.Lock()
+
+
+def authorized_client():
+    """The process-wide authorized gspread client, created on first use."""
+    global _gc
+    with _gc_lock:
+        if _gc is None:
+            creds = Credentials.from_service_account_info(load_google_creds(), scopes=SCOPES)
+            session = AuthorizedSession(creds)
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=HTTP_POOL_SIZE)
+            session.mount("https://", adapter)
+            _gc = gspread.authorize(creds, session=session)
+        return _gc
+
+
+class SheetsClient:
+    """Cached spreadsheet/worksheet handles on the shared authorized client."""
+
+    def __init__(self, spreadsheet_name=SPREADSHEET_NAME, worksheet_id=None, spreadsheet_id=None):
+        self.spreadsheet_name = spreadsheet_name
+        self.spreadsheet_id = spreadsheet_id
+        self.worksheet_id = worksheet_id
+        self._lock = threading.Lock()
+        self._worksheet = None
+
+    @property
+    def gc(self):
+        return authorized_client()
+
+    def worksheet(self):
+        """The target worksheet; resolved over the network only the first time."""
+        worksheet = self._worksheet
+        if worksheet is not None:
+            return worksheet
+        gc = self.gc
+        with self._lock:
+            if self._worksheet is None:
+                if self.spreadsheet_id:
+                    spreadsheet = gc.open_by_key(self.spreadsheet_id)
+                else:
+                    spreadsheet = gc.open(self.spreadsheet_name)
+                    self.spreadsheet_id = spreadsheet.id
+                if self.worksheet_id is None:
+                    worksheet = spreadsheet.sheet1
+                    self.worksheet_id = worksheet.id
+                else:
+                    worksheet = spreadsheet.get_worksheet_by_id(self.worksheet_id)
+                self._worksheet = worksheet
+            return self._worksheet
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_sheets_client(spreadsheet_name=SPREADSHEET_NAME, worksheet_id=None, spreadsheet_id=None):
+    """Process-wide SheetsClient for a spreadsheet (and optional worksheet)."""
+    key = (spreadsheet_id or spreadsheet_name, worksheet_id)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            if spreadsheet_id is None and spreadsheet_name == SPREADSHEET_NAME:
+                spreadsheet_id = SPREADSHEET_ID
+            client = _clients[key] = SheetsClient(spreadsheet_name, worksheet_id, spreadsheet_id)
+        return client
+
+
+def open_worksheet():
+    return get_sheets_client().worksheet()
+
+
+def load_leads(open_worksheet=open_worksheet):
+    with stage_timer("sheets_fetch") as timing:
+        records = open_worksheet().get_all_records()
+        timing["rows"] = len(records)
+    with stage_timer("parse", rows=len(records)):
+        return normalize_leads(records)
+
+
+def make_leads_loader(spreadsheet_name=SPREADSHEET_NAME, worksheet_id=None, spreadsheet_id=None):
+    # LABX_SYNC_MODE=full re-downloads the whole sheet on every refresh;
+    # the default only fetches rows appended since the last sync. Either way
+    # a refresh first checks LABX_CHANGE_SIGNAL (see sheet_changes.py).
+    client = get_sheets_client(spreadsheet_name, worksheet_id, spreadsheet_id)
+    if os.getenv("LABX_SYNC_MODE", "incremental") == "full":
+        loader = partial(load_leads, client.worksheet)
+    else:
+        loader = IncrementalSheetLoader(client.worksheet)
+    if CHANGE_SIGNAL == "off":
+        return loader
+    if CHANGE_SIGNAL not in SIGNALS:
+        raise ValueError(f"Unknown LABX_CHANGE_SIGNAL '{CHANGE_SIGNAL}'. Use {', '.join(SIGNALS)} or off.")
+    return ConditionalLoader(loader, partial(SIGNALS[CHANGE_SIGNAL], client))
@@ -0,0 +1,102 @@
+import weakref
+
+from gspread.utils import fill_gaps, rowcol_to_a1
+
+from leads_data import append_leads, normalize_rows
+from metrics import stage_timer
+
+# =========================
+# Incremental Sheets Sync
+# =========================
+# "Microfinance Leads" is append-only, so after the first full pull we only
+# need the rows below the last one we saw. Each sync is one batch_get of the
+# header row plus everything from the last synced row down; the last synced
+# row is re-read as an anchor so edits or deletions above it are detected.
+
+
+class IncrementalSheetLoader:
+    """Callable leads loader that appends new sheet rows to the previous frame.
+
+    `open_worksheet` is a zero-argument callable returning a gspread Worksheet.
+    Falls back to a full `get_all_records()` reload when the header changes or
+    the anchor row no longer matches (rows deleted or edited). `base_frame` is
+    the frame the last sync appended to, or None after a full reload.
+    """
+
+    def __init__(self, open_worksheet):
+        self._open_worksheet = open_worksheet
+        self.header = None
+        self.synced_rows = 0
+        self._anchor = None
+        self.frame = None
+        self._base = None
+        self.full_reloads = 0
+        self.incremental_syncs = 0
+
+    def __call__(self):
+        return self.sync()
+
+    @property
+    def base_frame(self):
+        # Weak, so the replaced frame is freed once the store lets go of it
+        return self._base() if self._base is not None else None
+
+    def state(self):
+        """Sync position, so a persisted frame can resume incremental syncing."""
+        return {"header": self.header, "synced_rows": self.synced_rows, "anchor": self._anchor}
+
+    def restore(self, frame, state):
+        self.frame = frame
+        self.header = state["header"]
+        self.synced_rows = state["synced_rows"]
+        self._anchor = state["anchor"]
+
+    def sync(self):
+        worksheet = self._open_worksheet()
+        if self.frame is None or not self.header:
+            return self._full_reload(worksheet)
+
+        # Re-read the last synced data row as the anchor (header is row 1)
+        width = len(self.header)
+        start_row = self.synced_rows + 1 if self.synced_rows else 2
+        last_col = rowcol_to_a1(1, width).rstrip("0123456789")
+        with stage_timer("sheets_fetch") as timing:
+            header_range, tail_range = worksheet.batch_get(["1:1", f"A{start_row}:{last_col}"])
+            timing["rows"] = len(tail_range)
+
+        header = fill_gaps(list(header_range), cols=width)[0] if header_range else []
+        if header != self.header:
+            return self._full_reload(worksheet)
+
+        tail = fill_gaps(list(tail_range), cols=width) if tail_range else []
+        if self.synced_rows:
+            if not tail or tail[0] != self._anchor:
+                return self._full_reload(worksheet)
+            tail = tail[1:]
+
+        self.incremental_syncs += 1
+        if not tail:
+            return self.frame
+
+        with stage_timer("parse", rows=len(tail)):
+            frame = append_leads(self.frame, normalize_rows(self.header, tail))
+        self._base, self.frame = weakref.ref(self.frame), frame
+        self.synced_rows += len(tail)
+        self._anchor = tail[-1]
+        return self.frame
+
+    def _full_reload(self, worksheet):
+        with stage_timer("sheets_fetch") as timing:
+            values = worksheet.get(pad_values=True)
+            timing["rows"] = len(values)
+        self.full_reloads += 1
+        if values == [[]]:
+            values = []
+        self.header = values[0] if values else []
+        rows = [row[:len(self.header)] for row in values[1:]]
+        with stage_timer("parse", rows=len(rows)):
+            self.frame = normalize_rows(self.header, rows)
+        self._base = None
+        self.synced_rows = len(rows)
+        self._anchor = rows[-1] if rows else None
+        return self.frame
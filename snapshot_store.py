@@ -0,0 +1,138 @@
+import argparse
+import json
+import logging
+import os
+import time
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from leads_data import BUSINESS_TIMEZONE, LEAD_SCHEMA, SHEET_TIMEZONE, TIME_COLUMNS, add_time_columns
+from metrics import stage_timer
+
+# =========================
+# Local Parquet Snapshot
+# =========================
+# A restarted instance boots from the last normalized leads frame on disk
+# (memory-mapped, no Sheets call, no ISO8601 parsing) and reconciles with
+# Google Sheets in the background. Build one ahead of deploy with:
+#
+#     python snapshot_store.py build
+
+SNAPSHOT_PATH = os.getenv("LABX_SNAPSHOT_PATH", "leads_snapshot.parquet")
+_SYNC_STATE_KEY = b"labx.sync_state"
+_WRITTEN_AT_KEY = b"labx.written_at"
+# Zones the stored TIME_COLUMNS were derived in; other zones re-derive on read
+_TIMEZONE_KEY = b"labx.timezone"
+_TIMEZONE = f"{SHEET_TIMEZONE}>{BUSINESS_TIMEZONE}".encode()
+
+logger = logging.getLogger(__name__)
+
+
+def to_table(frame, sync_state=None):
+    """Arrow table with typed Timestamp/Score columns, a dictionary-encoded Vehicle Type
+    and the ingest-time TIME_COLUMNS."""
+    vehicles = frame['Vehicle Type'].cat
+    table = pa.table({
+        'Timestamp': pa.array(frame['Timestamp'], from_pandas=True),
+        'Score': pa.array(frame['Score'], type=pa.float32(), from_pandas=True),
+        'Vehicle Type': pa.DictionaryArray.from_arrays(
+            pa.array(vehicles.codes.to_numpy(), mask=vehicles.codes.to_numpy() < 0),
+            pa.array(vehicles.categories.astype(str)),
+        ),
+        **{name: pa.array(frame[name].to_numpy()) for name in TIME_COLUMNS if name in frame.columns},
+    })
+    metadata = {_WRITTEN_AT_KEY: str(time.time()).encode(), _TIMEZONE_KEY: _TIMEZONE}
+    if sync_state is not None:
+        metadata[_SYNC_STATE_KEY] = json.dumps(sync_state).encode()
+    return table.replace_schema_metadata(metadata)
+
+
+def write_snapshot(frame, path=SNAPSHOT_PATH, sync_state=None):
+    # Write next to the target and rename, so readers never see a partial file
+    tmp_path = f"{path}.tmp"
+    pq.write_table(to_table(frame, sync_state), tmp_path)
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(path=SNAPSHOT_PATH):
+    """Return (frame, sync_state, written_at), or None if there is no snapshot."""
+    if not os.path.exists(path):
+        return None
+    schema = pq.read_schema(path, memory_map=True)
+    metadata = schema.metadata or {}
+    current = metadata.get(_TIMEZONE_KEY) == _TIMEZONE and all(name in schema.names for name in TIME_COLUMNS)
+    columns = list(LEAD_SCHEMA) + (list(TIME_COLUMNS) if current else [])
+    table = pq.read_table(path, columns=columns, memory_map=True)
+    sync_state = json.loads(metadata[_SYNC_STATE_KEY]) if _SYNC_STATE_KEY in metadata else None
+    written_at = float(metadata.get(_WRITTEN_AT_KEY, 0)) or os.path.getmtime(path)
+    # No-op for current snapshots; upgrades older float64/plain-string files
+    frame = table.to_pandas().astype({'Score': 'float32', 'Vehicle Type': 'category'})
+    if not current:
+        frame = add_time_columns(frame)
+    return frame, sync_state, written_at
+
+
+def attach_snapshot(store, path=SNAPSHOT_PATH):
+    """Seed `store` from the snapshot on disk and keep the snapshot up to date.
+
+    Intended as the `setup` hook of `leads_data.get_store`.
+    """
+    try:
+        with stage_timer("snapshot_read") as timing:
+            saved = read_snapshot(path)
+            timing["rows"] = len(saved[0]) if saved is not None else 0
+    except Exception as e:
+        logger.warning("Ignoring unreadable leads snapshot %s: %s", path, e)
+        saved = None
+
+    if saved is not None:
+        frame, sync_state, _ = saved
+        if sync_state is not None and hasattr(store.loader, "restore"):
+            store.loader.restore(frame, sync_state)
+        store.seed(frame)
+        store.refresh_in_background()
+
+    last_written = {"frame": saved[0] if saved is not None else None}
+
+    def save(snapshot):
+        if snapshot.frame is last_written["frame"]:
+            return
+        sync_state = store.loader.state() if hasattr(store.loader, "state") else None
+        try:
+            write_snapshot(snapshot.frame, path, sync_state)
+            last_written["frame"] = snapshot.frame
+        except Exception as e:
+            logger.warning("Could not write leads snapshot %s: %s", path, e)
+
+    store.add_listener(save)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or inspect the local leads snapshot.")
+    parser.add_argument("command", choices=["build", "info"])
+    parser.add_argument("--path", default=SNAPSHOT_PATH, help=f"snapshot file (default: {SNAPSHOT_PATH})")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        from sheets_client import open_worksheet
+        from sheets_sync import IncrementalSheetLoader
+
+        loader = IncrementalSheetLoader(open_worksheet)
+        started = time.perf_counter()
+        frame = loader()
+        write_snapshot(frame, args.path, loader.state())
+        print(f"Wrote {len(frame)} leads to {args.path} in {time.perf_counter() - started:.1f}s")
+    else:
+        saved = read_snapshot(args.path)
+        if saved is None:
+            print(f"No snapshot at {args.path}")
+            return 1
+        frame, sync_state, written_at = saved
+        print(f"{args.path}: {len(frame)} leads, written {time.ctime(written_at)}")
+        print(frame.dtypes.to_string())
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
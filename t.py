@@ -1,14 +1,10 @@
 import streamlit as st
 import pandas as pd
-import gspread, json, copy, base64
-from google.oauth2.service_account import Credentials
+from sheets_client import get_sheets_client
 import plotly.express as px
-import yaml
-from yaml.loader import SafeLoader
 import streamlit_authenticator as stauth
 from datetime import datetime, timezone, timedelta
-import os, io
-from fpdf import FPDF
+import os
 
 # =========================
 # Page Config
@@ -237,19 +233,9 @@ if authentication_status:
     # ------------------------- 
     # Google Sheets setup
     # ------------------------- 
-    SCOPES = ['https://www.googleapis.com/auth/spreadsheets', 'https://www.googleapis.com/auth/drive']
-   # Load and decode Base64 credentials
-    b64_creds = os.getenv("GOOGLE_CREDENTIALS_B64")
-    if not b64_creds:
-        raise ValueError("Missing GOOGLE_CREDENTIALS_B64 environment variable")
-
-    decoded = base64.b64decode(b64_creds).decode()
-    google_creds = json.loads(decoded)
-
-    creds = Credentials.from_service_account_info(google_creds, scopes=SCOPES)
-
-    gc = gspread.authorize(creds)
-    sheet = gc.open("Microfinance Leads").sheet1
+    # Long-lived client: credentials (GOOGLE_CREDENTIALS_B64) are decoded and
+    # authorized once per process, not on every rerun (see sheets_client.py)
+    sheet = get_sheets_client().worksheet()
 
     # ------------------------- 
     # Load Data
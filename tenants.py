@@ -0,0 +1,221 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from ingest_worker import INGEST_INTERVAL_SECONDS, INGEST_MODE, get_worker, setup_lead_store
+from leads_data import DEFAULT_TTL_SECONDS, TIME_COLUMNS, get_store, time_columns
+from metrics import metrics
+from sheets_client import SPREADSHEET_NAME, make_leads_loader
+from snapshot_store import SNAPSHOT_PATH
+
+# =========================
+# Tenants
+# =========================
+# Each username maps to the spreadsheet (and optionally worksheet) holding its
+# leads, via an optional `tenants` section in config.yaml:
+#
+#     tenants:
+#       smep:
+#         spreadsheet: "SMEP Leads"      # or spreadsheet_id: "1AbC..."
+#         worksheet_id: 0                # optional, defaults to the first sheet
+#         label: "SMEP"                  # optional, shown to admins
+#
+# Users without an entry see the default "Microfinance Leads" sheet. Every
+# tenant gets its own LeadStore, and with it its own results/figure/report
+# caches (all keyed per store) and its own Parquet snapshot file.
+#
+# Admins can also pick "All tenants": a store whose loader pulls every
+# tenant's store on a bounded thread pool (LABX_TENANT_WORKERS) and combines
+# the frames, so a refresh takes about as long as the slowest sheet rather
+# than the sum of all of them.
+
+TENANT_WORKERS = int(os.getenv("LABX_TENANT_WORKERS", "8"))
+ALL_TENANTS = "All tenants"
+# Extra column on the combined frame naming each lead's tenant
+TENANT_COLUMN = "Tenant"
+
+
+@dataclass(frozen=True)
+class Tenant:
+    """Where one tenant's leads live."""
+    spreadsheet_name: str = SPREADSHEET_NAME
+    worksheet_id: int = None
+    spreadsheet_id: str = None
+    label: str = None
+
+    @property
+    def key(self):
+        sheet = self.spreadsheet_id or self.spreadsheet_name
+        return sheet if self.worksheet_id is None else f"{sheet}#{self.worksheet_id}"
+
+    @property
+    def name(self):
+        return self.label or self.key
+
+    @property
+    def snapshot_path(self):
+        if self.key == DEFAULT_TENANT.key:
+            return SNAPSHOT_PATH
+        root, extension = os.path.splitext(SNAPSHOT_PATH)
+        slug = "".join(c if c.isalnum() else "_" for c in self.key).strip("_").lower()
+        return f"{root}.{slug}{extension}"
+
+
+DEFAULT_TENANT = Tenant()
+
+
+def _parse_tenant(username, entry):
+    if isinstance(entry, str):
+        entry = {"spreadsheet": entry}
+    if not isinstance(entry, dict) or not (entry.get("spreadsheet") or entry.get("spreadsheet_id")):
+        raise ValueError(f"config.yaml tenant for '{username}' needs a 'spreadsheet' name or 'spreadsheet_id'.")
+    worksheet_id = entry.get("worksheet_id")
+    try:
+        worksheet_id = None if worksheet_id is None else int(worksheet_id)
+    except (TypeError, ValueError):
+        raise ValueError(f"config.yaml tenant for '{username}' has a non-numeric worksheet_id: {worksheet_id!r}.")
+    return Tenant(
+        spreadsheet_name=entry.get("spreadsheet") or entry["spreadsheet_id"],
+        worksheet_id=worksheet_id,
+        spreadsheet_id=entry.get("spreadsheet_id"),
+        label=entry.get("label"),
+    )
+
+
+def tenant_map(config):
+    """{username: Tenant} from the config's optional `tenants` section."""
+    section = config.get("tenants") or {}
+    if not isinstance(section, dict):
+        raise ValueError("config.yaml 'tenants' must map usernames to spreadsheet entries.")
+    return {str(username).lower(): _parse_tenant(username, entry) for username, entry in section.items()}
+
+
+def tenant_for(config, username):
+    return tenant_map(config).get(str(username).lower(), DEFAULT_TENANT)
+
+
+def all_tenants(config):
+    """Every distinct tenant, in config order; the default one only if some user lacks an entry."""
+    mapping = tenant_map(config)
+    usernames = (config.get("credentials") or {}).get("usernames") or {}
+    tenants = list(mapping.values())
+    if not mapping or any(str(username).lower() not in mapping for username in usernames):
+        tenants.insert(0, DEFAULT_TENANT)
+    # Users sharing a spreadsheet share its tenant
+    unique = {}
+    for tenant in tenants:
+        unique.setdefault(tenant.key, tenant)
+    unique = list(unique.values())
+    names = [tenant.name for tenant in unique]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"config.yaml tenants share a label: {', '.join(duplicates)}. Give each spreadsheet its own label.")
+    return unique
+
+
+def _setup_tenant_store(tenant, store):
+    if hasattr(store.loader, "stats"):
+        # Refreshes skipped as unchanged (see sheet_changes.py) export as cache hits
+        metrics.register_cache(f"sheet:{tenant.key}", store.loader)
+    setup_lead_store(store, path=tenant.snapshot_path)
+
+
+def tenant_store(tenant):
+    """The process-wide LeadStore for `tenant`, with its own snapshot file and ingest worker."""
+    return get_store(
+        f"tenant:{tenant.key}",
+        partial(make_leads_loader, tenant.spreadsheet_name, tenant.worksheet_id, tenant.spreadsheet_id),
+        setup=partial(_setup_tenant_store, tenant),
+    )
+
+
+def combine_leads(frames):
+    """One leads frame from `{name: frame}`, with a categorical TENANT_COLUMN."""
+    names = list(frames)
+    parts = list(frames.values())
+    times = [time_columns(part) for part in parts]
+    return pd.DataFrame({
+        'Timestamp': np.concatenate([part['Timestamp'].to_numpy() for part in parts]),
+        'Score': np.concatenate([part['Score'].to_numpy() for part in parts]),
+        'Vehicle Type': union_categoricals([part['Vehicle Type'] for part in parts]),
+        **{name: np.concatenate([columns[name] for columns in times]) for name in TIME_COLUMNS},
+        TENANT_COLUMN: pd.Categorical.from_codes(
+            np.repeat(np.arange(len(names), dtype=np.int16), [len(part) for part in parts]), categories=names),
+    })
+
+
+class AllTenantsLoader:
+    """LeadStore loader combining every tenant's leads, fetched concurrently.
+
+    Each tenant is read through its own store, so its TTL, single-flight and
+    ingest worker still apply; a tenant that fails is left out (see `errors`)
+    unless they all fail. Returns the previous frame object when no tenant has
+    new data, so the combined store keeps its version.
+    """
+
+    def __init__(self, tenants, workers=TENANT_WORKERS, store_for=None):
+        self.tenants = list(tenants)
+        # Tenant -> LeadStore; tenant_store unless a caller (e.g. a benchmark) supplies its own
+        self._store_for = store_for or tenant_store
+        self._executor = ThreadPoolExecutor(max_workers=max(1, min(workers, len(self.tenants))),
+                                            thread_name_prefix="labx-tenants")
+        self._lock = threading.Lock()
+        self._versions = None
+        self._frame = None
+        self.errors = {}
+        self.fetch_seconds = {}
+        self.last_load_seconds = None
+
+    def _fetch(self, tenant, force):
+        started = time.perf_counter()
+        store = self._store_for(tenant)
+        if force:
+            if hasattr(store.loader, "invalidate"):
+                store.loader.invalidate()
+            snapshot = store.refresh()
+        elif get_worker(store) is not None and store.snapshot is not None:
+            snapshot = store.snapshot
+        else:
+            snapshot = store.get()
+        return snapshot, time.perf_counter() - started
+
+    def load(self, force=False):
+        """Combined frame; `force` refreshes every tenant store first."""
+        started = time.perf_counter()
+        futures = {tenant: self._executor.submit(self._fetch, tenant, force) for tenant in self.tenants}
+        snapshots, errors, fetch_seconds = {}, {}, {}
+        for tenant, future in futures.items():
+            try:
+                snapshots[tenant], fetch_seconds[tenant.name] = future.result()
+            except Exception as e:
+                errors[tenant.name] = e
+        if not snapshots:
+            raise next(iter(errors.values()))
+
+        with self._lock:
+            versions = tuple((tenant.key, snapshot.version) for tenant, snapshot in snapshots.items())
+            if versions != self._versions:
+                self._frame = combine_leads({tenant.name: snapshot.frame for tenant, snapshot in snapshots.items()})
+                self._versions = versions
+            self.errors = errors
+            self.fetch_seconds = fetch_seconds
+            self.last_load_seconds = time.perf_counter() - started
+            return self._frame
+
+    def __call__(self):
+        return self.load()
+
+
+def all_tenants_store(tenants):
+    """The admin store over `tenants`; one per distinct tenant list."""
+    tenants = list(tenants)
+    # Re-combining unchanged tenants is cheap, so follow the ingest workers closely
+    ttl = min(DEFAULT_TTL_SECONDS, INGEST_INTERVAL_SECONDS) if INGEST_MODE == "background" else DEFAULT_TTL_SECONDS
+    return get_store("tenants:" + "|".join(tenant.key for tenant in tenants), partial(AllTenantsLoader, tenants), ttl=ttl)
@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from leads_data import MISSING, TIME_COLUMNS, add_time_columns, derive_time_columns, local_time
+
+
+def day(value):
+    """Days since 1970-01-01 for an ISO date string."""
+    return int((np.datetime64(value, 'D') - np.datetime64('1970-01-01', 'D')).astype(np.int64))
+
+
+def derive(timestamps, timezone, sheet_timezone):
+    return derive_time_columns(pd.to_datetime(pd.Series(timestamps)), timezone, sheet_timezone)
+
+
+def test_nairobi_leads_near_midnight():
+    columns = derive(["2026-03-14 23:59:00", "2026-03-15 00:30:00"], "Africa/Nairobi", "Africa/Nairobi")
+    assert list(columns['Local Day']) == [day("2026-03-14"), day("2026-03-15")]
+    assert list(columns['Local Hour']) == [23, 0]
+
+
+def test_utc_sheet_crosses_midnight_in_nairobi():
+    # 21:30 UTC is 00:30 the next day at UTC+3; 20:59 UTC is still 23:59
+    columns = derive(["2026-03-14 20:59:00", "2026-03-14 21:30:00"], "Africa/Nairobi", "UTC")
+    assert list(columns['Local Day']) == [day("2026-03-14"), day("2026-03-15")]
+    assert list(columns['Local Hour']) == [23, 0]
+
+
+def test_berlin_spring_forward():
+    # 2026-03-29: 01:00 UTC moves Berlin from 02:00 CET to 03:00 CEST
+    columns = derive(["2026-03-28 23:30:00", "2026-03-29 00:59:00", "2026-03-29 01:00:00", "2026-03-29 22:30:00"],
+                     "Europe/Berlin", "UTC")
+    assert list(columns['Local Day']) == [day("2026-03-29")] * 3 + [day("2026-03-30")]
+    assert list(columns['Local Hour']) == [0, 1, 3, 0]
+
+
+def test_berlin_fall_back():
+    # 2026-10-25: 01:00 UTC moves Berlin from 03:00 CEST back to 02:00 CET
+    columns = derive(["2026-10-24 21:59:00", "2026-10-24 22:30:00", "2026-10-25 00:30:00", "2026-10-25 01:30:00",
+                      "2026-10-25 23:30:00"], "Europe/Berlin", "UTC")
+    assert list(columns['Local Day']) == [day("2026-10-24")] + [day("2026-10-25")] * 3 + [day("2026-10-26")]
+    assert list(columns['Local Hour']) == [23, 0, 2, 2, 0]
+
+
+def test_new_york_transition_days():
+    # Spring forward 2026-03-08 at 07:00 UTC; fall back 2026-11-01 at 06:00 UTC
+    columns = derive(["2026-03-08 06:59:00", "2026-03-08 07:00:00", "2026-03-09 03:59:00", "2026-03-09 04:00:00",
+                      "2026-11-01 05:30:00", "2026-11-01 06:30:00", "2026-11-02 04:59:00", "2026-11-02 05:00:00"],
+                     "America/New_York", "UTC")
+    assert list(columns['Local Day']) == [day("2026-03-08")] * 3 + [day("2026-03-09")] + [day("2026-11-01")] * 3 + [day("2026-11-02")]
+    assert list(columns['Local Hour']) == [1, 3, 23, 0, 1, 1, 23, 0]
+
+
+def test_new_york_sheet_ambiguous_and_skipped_wall_times():
+    # Naive sheet times in New York: 01:30 on fall-back day reads as standard
+    # time (06:30 UTC); 02:30 on spring-forward day does not exist and moves to 03:00 EDT (07:00 UTC)
+    local = local_time(pd.to_datetime(pd.Series(["2026-11-01 01:30:00", "2026-03-08 02:30:00"])), "UTC", "America/New_York")
+    assert list(local) == [np.datetime64("2026-11-01T06:30"), np.datetime64("2026-03-08T07:00")]
+
+
+def test_same_zone_keeps_wall_clock():
+    timestamps = pd.to_datetime(pd.Series(["2026-03-08 02:30:00", "2026-11-01 01:30:00"]))
+    local = local_time(timestamps, "America/New_York", "America/New_York")
+    assert list(local) == list(timestamps.to_numpy())
+
+
+def test_aware_timestamps_ignore_sheet_zone():
+    timestamps = pd.to_datetime(pd.Series(["2026-03-14 21:30:00"])).dt.tz_localize("UTC")
+    columns = derive_time_columns(timestamps, "Africa/Nairobi", "America/New_York")
+    assert list(columns['Local Day']) == [day("2026-03-15")]
+    assert list(columns['Local Hour']) == [0]
+
+
+@pytest.mark.parametrize("timestamp, iso_week, month", [
+    ("2025-12-28 12:00:00", 202552, 202512),   # Sunday closing ISO 2025-W52
+    ("2025-12-29 00:30:00", 202601, 202512),   # Monday opening ISO 2026-W01
+    ("2026-01-01 23:59:00", 202601, 202601),
+    ("2027-01-01 00:30:00", 202653, 202701),   # Friday in ISO 2026-W53
+    ("2027-01-04 00:00:00", 202701, 202701),
+    ("2021-01-03 23:59:00", 202053, 202101),
+])
+def test_iso_week_and_month_at_year_boundary(timestamp, iso_week, month):
+    columns = derive([timestamp], "Africa/Nairobi", "Africa/Nairobi")
+    assert columns['ISO Week'][0] == iso_week
+    assert columns['Month'][0] == month
+
+
+def test_iso_week_follows_local_day():
+    # 2025-12-28 21:30 UTC is Monday 2025-12-29 00:30 in Nairobi
+    columns = derive(["2025-12-28 21:30:00"], "Africa/Nairobi", "UTC")
+    assert columns['ISO Week'][0] == 202601
+
+
+def test_missing_timestamps_get_missing_values():
+    columns = derive([None, "2026-03-14 12:00:00", None], "Europe/Berlin", "UTC")
+    for name, missing in MISSING.items():
+        assert columns[name][0] == missing and columns[name][2] == missing
+    assert columns['Local Hour'][1] == 13
+
+
+def test_columns_are_compact():
+    frame = add_time_columns(pd.DataFrame({'Timestamp': pd.to_datetime(["2026-03-14 12:00:00", None])}))
+    for name, dtype in TIME_COLUMNS.items():
+        assert frame[name].dtype == np.dtype(dtype)
@@ -0,0 +1,126 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from filter_engine import get_filter_index
+from leads_data import local_time
+
+# =========================
+# Leads Over Time: Resolution and Downsampling
+# =========================
+# The timeline chart can be drawn per day, per hour or per lead. Whatever the
+# resolution, at most about one point per horizontal pixel is sent to the
+# browser: longer series are reduced with LTTB (shape-preserving) or min/max
+# bucketing (keeps every spike), and past WEBGL_THRESHOLD points the trace is
+# drawn with WebGL. Box-selecting a time window on the chart zooms in: only
+# that window is re-queried, at the finest resolution that fits.
+#
+# Streamlit does not report the chart's pixel width, so the point budget comes
+# from LABX_CHART_WIDTH_PX (the wide layout's main column on a 1080p screen).
+
+CHART_WIDTH_PX = int(os.getenv("LABX_CHART_WIDTH_PX", "1200"))
+WEBGL_THRESHOLD = int(os.getenv("LABX_WEBGL_THRESHOLD", "1000"))
+DOWNSAMPLE_METHOD = os.getenv("LABX_DOWNSAMPLE", "lttb")
+
+RESOLUTIONS = ["Day", "Hour", "Lead"]
+# Finest resolution a zoom window gets, by its length
+LEAD_WINDOW = pd.Timedelta(days=2)
+HOUR_WINDOW = pd.Timedelta(days=60)
+
+
+def lttb_indices(x, y, points):
+    """Largest-Triangle-Three-Buckets: positions of `points` samples that keep the shape."""
+    size = len(x)
+    if points >= size or points < 3:
+        return np.arange(size)
+    # points - 2 buckets between the fixed first and last samples
+    edges = np.linspace(1, size - 1, points - 1).astype(np.int64)
+    picked = np.empty(points, dtype=np.int64)
+    picked[0], picked[-1] = 0, size - 1
+    anchor = 0
+    for bucket in range(points - 2):
+        lo, hi = edges[bucket], edges[bucket + 1]
+        next_lo = edges[bucket + 1]
+        next_hi = edges[bucket + 2] if bucket + 2 < points - 1 else size
+        avg_x, avg_y = x[next_lo:next_hi].mean(), y[next_lo:next_hi].mean()
+        area = np.abs((x[anchor] - avg_x) * (y[lo:hi] - y[anchor]) - (x[anchor] - x[lo:hi]) * (avg_y - y[anchor]))
+        anchor = lo + int(np.argmax(area))
+        picked[bucket + 1] = anchor
+    return picked
+
+
+def minmax_indices(y, points):
+    """Positions of the minimum and maximum of each of `points // 2` equal buckets."""
+    size = len(y)
+    if points >= size:
+        return np.arange(size)
+    edges = np.linspace(0, size, max(points // 2, 1) + 1).astype(np.int64)
+    picked = []
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        if hi > lo:
+            segment = y[lo:hi]
+            picked += sorted({lo + int(np.argmin(segment)), lo + int(np.argmax(segment))})
+    return np.array(picked, dtype=np.int64)
+
+
+def downsample(series, points=CHART_WIDTH_PX, method=DOWNSAMPLE_METHOD):
+    """At most `points` rows of a ['Timestamp', value] frame, chosen by `method`."""
+    if len(series) <= points:
+        return series
+    y = series.iloc[:, 1].to_numpy(dtype=np.float64)
+    if method == "minmax":
+        picked = minmax_indices(y, points)
+    elif method == "lttb":
+        x = series['Timestamp'].to_numpy().view(np.int64).astype(np.float64)
+        picked = lttb_indices(x, y, points)
+    else:
+        raise ValueError(f"Unknown downsampling method '{method}'. Use 'lttb' or 'minmax'.")
+    return series.iloc[picked].reset_index(drop=True)
+
+
+def zoom_resolution(start, end):
+    """Finest resolution that keeps a zoom window from `start` to `end` readable."""
+    span = pd.Timestamp(end) - pd.Timestamp(start)
+    if span <= LEAD_WINDOW:
+        return "Lead"
+    if span <= HOUR_WINDOW:
+        return "Hour"
+    return "Day"
+
+
+def timeline_series(store, snapshot, cube, resolution, filters, window=None):
+    """['Timestamp', 'Leads'] per day/hour (scored leads), or ['Timestamp', 'Score'] per lead.
+
+    Per-day series also carry the 7- and 28-day moving averages.
+    `filters` are the dashboard filters; `window` an optional (start, end) zoom
+    that further limits the time range.
+    """
+    start_date, end_date, min_score, max_score, vehicle_types = filters
+    if window is not None:
+        start, end = pd.Timestamp(window[0]), pd.Timestamp(window[1])
+        start_date, end_date = max(start_date, start.date()), min(end_date, end.date())
+    filters = (start_date, end_date, min_score, max_score, vehicle_types)
+
+    if resolution == "Lead":
+        positions = get_filter_index(store, snapshot).select(*filters)
+        frame = snapshot.frame
+        series = pd.DataFrame({
+            'Timestamp': local_time(frame['Timestamp'].to_numpy()[positions]),
+            'Score': frame['Score'].to_numpy()[positions],
+        }).dropna()
+    else:
+        counts = cube.query(*filters).daily if resolution == "Day" else cube.hourly_series(*filters)
+        series = counts.rename_axis('Timestamp').reset_index()
+        series.columns = ['Timestamp', 'Leads']
+        if resolution == "Day" and len(series):
+            series = series.join(cube.moving_averages(*filters), on='Timestamp')
+    if window is not None:
+        # Day and hour points are stamped at the start of their bucket, so keep
+        # the bucket the window starts in
+        if resolution == "Day":
+            start = start.floor("D")
+        elif resolution == "Hour":
+            start = start.floor("h")
+        series = series[series['Timestamp'].between(start, end)].reset_index(drop=True)
+    return series